@@ -0,0 +1,133 @@
+import random
+from collections import namedtuple
+
+from rules import decks_needed
+from winprob import load_win_probs
+
+# 第一次决策时映射预先生成的胜率表（python winprob.py），没有该文件时为 None，按牌型决策
+_NOT_LOADED = object()
+win_probs = _NOT_LOADED
+# 多数底池在比牌或弃牌中决出，很少有全部对手都坚持到最后，按至多2个对手估计胜率
+WIN_PROB_OPPONENTS = 2
+
+# 按胜率决策时的阈值：加注、未看牌加注、未看牌跟注/加注、一定比牌、一半概率比牌
+Thresholds = namedtuple("Thresholds", "raise_prob blind_raise_prob blind_call_prob compare_prob maybe_compare_prob")
+THRESHOLDS = Thresholds(0.6, 0.7, 0.4, 0.8, 0.6)
+
+def ai_decision(table, seat, rng=random, thresholds=THRESHOLDS):
+    """AI 决策逻辑，第二轮起可比牌，消耗跟注筹码，第一轮看牌后必须跟注/加注/弃牌
+
+    table 为 engine.Table，seat 为行动的座位。有胜率表时按战胜剩余对手的概率和 thresholds 决策，
+    没有胜率表或 thresholds 为 None 时按牌型决策。
+    """
+    info = table.hand_info(seat)
+    current_bet = table.current_bet
+    seen = table.seen[seat]
+    pot = table.pot
+    round_num = table.round_num
+    if table.chips[seat] < current_bet * (2 if seen else 1):
+        return "fold"
+
+    pot_odds = current_bet / (pot + current_bet) if pot + current_bet > 0 else 1.0
+
+    probs = win_probs
+    if probs is _NOT_LOADED:
+        probs = _load_win_probs()
+    if probs is not None and thresholds is not None:
+        num_cards = len(info.hand)
+        num_opponents = min(table.num_active - 1, WIN_PROB_OPPONENTS)
+        # 按牌桌实际的副数查表：多副牌时豹子等大牌型多得多
+        num_decks = table.dealer.num_decks if table.dealer is not None else decks_needed(len(table.names), num_cards)
+        win_prob = probs.lookup(info.strength, num_cards, num_opponents, num_decks)
+        if win_prob is not None:
+            cost = current_bet * (2 if seen else 1)
+            return _win_prob_decision(win_prob, probs.lookup(info.strength, num_cards, 1, num_decks), seen, round_num,
+                                      pot_odds, cost / (pot + cost), table.after_see, rng, thresholds)
+
+    hand_strength = info.score[0]
+
+    # 第一轮看牌后，必须选择跟注、加注或弃牌
+    if round_num == 1 and seen and table.after_see:
+        if hand_strength >= 3:  # 强牌优先加注
+            return "raise"
+        elif hand_strength >= 1 and pot_odds < 0.3:  # 中等牌跟注
+            return "call"
+        else:
+            return "fold"
+
+    # 第二轮及以后，考虑比牌（无论是否看牌）
+    if round_num >= 2:
+        if hand_strength >= 4:  # 豹子或同花顺
+            return "compare"
+        elif hand_strength >= 3 and rng.random() < 0.7:  # 同花，70%概率比牌
+            return "compare"
+        elif hand_strength >= 2 and rng.random() < 0.3:  # 顺子，30%概率比牌
+            return "compare"
+
+    # 已看牌：跟注、加注、弃牌
+    if seen:
+        if hand_strength >= 3:
+            return "raise"
+        elif hand_strength >= 1 and pot_odds < 0.25:
+            return "call"
+        else:
+            return "fold"
+
+    # 未看牌：看牌、跟注、加注、弃牌
+    if hand_strength >= 4:
+        return "raise"
+    elif hand_strength >= 2 and pot_odds < 0.3:
+        return rng.choice(["raise", "call"])
+    elif rng.random() < 0.4 and round_num <= 3:
+        return "see"
+    elif pot_odds < 0.2:
+        return "call"
+    else:
+        return "fold"
+
+def _load_win_probs():
+    global win_probs
+    win_probs = load_win_probs()
+    return win_probs
+
+def _win_prob_decision(win_prob, duel_prob, seen, round_num, pot_odds, call_odds, after_see, rng, thresholds):
+    """按胜率决策：win_prob 为战胜剩余对手的概率，duel_prob 为比牌（一对一）获胜的概率
+
+    call_odds 为本次跟注金额占跟注后底池的比例，胜率高于它时跟注有利。
+    """
+    # 第一轮看牌后，必须选择跟注、加注或弃牌
+    if round_num == 1 and seen and after_see:
+        if win_prob >= thresholds.raise_prob:
+            return "raise"
+        elif win_prob > call_odds:
+            return "call"
+        else:
+            return "fold"
+
+    # 第二轮及以后，一对一胜算大时比牌
+    if round_num >= 2:
+        if duel_prob >= thresholds.compare_prob:
+            return "compare"
+        elif duel_prob >= thresholds.maybe_compare_prob and rng.random() < 0.5:
+            return "compare"
+
+    # 已看牌：跟注、加注、弃牌
+    if seen:
+        if win_prob >= thresholds.raise_prob:
+            return "raise"
+        elif win_prob > call_odds:
+            return "call"
+        else:
+            return "fold"
+
+    # 未看牌：看牌、跟注、加注、弃牌
+    if win_prob >= thresholds.blind_raise_prob:
+        return "raise"
+    elif win_prob >= thresholds.blind_call_prob and pot_odds < 0.3:
+        return rng.choice(["raise", "call"])
+    elif rng.random() < 0.4 and round_num <= 3:
+        return "see"
+    elif win_prob > pot_odds:
+        return "call"
+    else:
+        return "fold"
@@ -0,0 +1,84 @@
+import itertools
+
+import numpy as np
+
+from rules import hand_strengths, load_tables
+
+# 批量评估：一次处理 N 手牌，全部在 NumPy 中完成，不逐手调用 evaluate_hand。
+# 牌使用 rules 中的整数编码 0-51，输入为形状 (N, k) 的整数数组。
+strength_table = None  # 第一次使用时才读入查找表，导入本模块没有文件读写
+
+def _strength_table():
+    """返回与 hand_strengths 共享内存的 uint16 数组，之后 hand_strengths 不能再改变大小"""
+    global strength_table
+    if strength_table is None:
+        load_tables()
+        strength_table = np.frombuffer(hand_strengths, dtype=np.uint16)
+    return strength_table
+
+def batch_strength(cards):
+    """返回每手牌中最大3张牌的压缩牌力，形状 (N,)，与 hand_strength(select_best_three(...)) 相同"""
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.ndim != 2 or cards.shape[1] < 3:
+        raise ValueError(f"需要形状为 (N, k) 且 k >= 3 的数组: {cards.shape}")
+    table = _strength_table()
+    best = None
+    for a, b, c in itertools.combinations(range(cards.shape[1]), 3):
+        strength = table[(cards[:, a] * 52 + cards[:, b]) * 52 + cards[:, c]]
+        best = strength if best is None else np.maximum(best, strength)
+    return best
+
+def batch_evaluate(cards):
+    """批量评估，返回 (牌型, 比较点数, 压缩牌力)
+
+    牌型形状 (N,)；比较点数形状 (N, 3)，对子为 [对子点数, 单张点数, 0]；
+    压缩牌力可以直接比较大小。
+    """
+    strengths = batch_strength(cards)
+    categories = (strengths >> 12).astype(np.int8)
+    tie_ranks = np.stack([(strengths >> 8) & 0xF, (strengths >> 4) & 0xF, strengths & 0xF], axis=1).astype(np.int8)
+    return categories, tie_ranks, strengths
+
+def batch_compare(cards1, cards2):
+    """逐行比较两组手牌，返回 1 / 0 / -1 数组，与 compare_hands 含义相同"""
+    strength1 = batch_strength(cards1).astype(np.int32)
+    strength2 = batch_strength(cards2).astype(np.int32)
+    return np.sign(strength1 - strength2).astype(np.int8)
+
+def batch_showdown(cards):
+    """多人比牌：cards 形状 (N, 玩家数, k)，返回每个玩家是否为最大牌（平局时多人为 True）"""
+    cards = np.asarray(cards)
+    num_games, num_players, num_cards = cards.shape
+    strengths = batch_strength(cards.reshape(num_games * num_players, num_cards)).reshape(num_games, num_players)
+    return strengths == strengths.max(axis=1, keepdims=True)
+
+def deal_batch(num_games, num_players, num_cards, seed=None, out=None, chunk_size=1 << 16, num_decks=1):
+    """一次发出 num_games 局牌，返回形状 (num_games, num_players, num_cards) 的 uint8 数组
+
+    可以传入预先分配的 out 数组（C 连续的 uint8）重复使用；按 chunk_size 局分块生成，临时内存与总局数无关。
+    num_decks > 1 时从混合的多副牌中发牌，同一张牌最多出现 num_decks 次。
+    """
+    needed = num_players * num_cards
+    size = 52 * num_decks
+    if needed > size:
+        raise ValueError("牌数不足")
+    if out is None:
+        out = np.empty((num_games, num_players, num_cards), dtype=np.uint8)
+    elif out.shape != (num_games, num_players, num_cards):
+        raise ValueError(f"out 的形状应为 {(num_games, num_players, num_cards)}: {out.shape}")
+    elif out.dtype != np.uint8 or not out.flags.c_contiguous:
+        raise ValueError("out 应为 C 连续的 uint8 数组")  # 否则 reshape 会复制，结果写不回 out
+    rng = np.random.default_rng(seed)
+    flat = out.reshape(num_games, needed)
+    for start in range(0, num_games, chunk_size):
+        stop = min(start + chunk_size, num_games)
+        keys = rng.random((stop - start, size))
+        # 随机键最小的 needed 张牌按键排序，即一副均匀洗过的牌的前 needed 张
+        if needed < size:
+            picked = np.argpartition(keys, needed - 1, axis=1)[:, :needed]
+            order = np.argsort(np.take_along_axis(keys, picked, axis=1), axis=1)
+            picked = np.take_along_axis(picked, order, axis=1)
+        else:
+            picked = np.argsort(keys, axis=1)
+        flat[start:stop] = picked % 52 if num_decks > 1 else picked
+    return out
@@ -0,0 +1,181 @@
+"""炸金花性能基准测试
+
+对 evaluate_hand、select_best_three、compare_hands、deal_cards、Dealer、ai_decision 做微基准测试
+（每人 3-13 张牌），并测量完整模拟对局的速度（4人 3-13 张牌，以及 2-12 人的大牌桌）。
+所有输入用固定种子生成，结果以 JSON 输出，便于在不同提交之间比较：
+
+    python bench.py --output before.json
+    python bench.py --output after.json
+    python bench.py --compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from rules import Dealer, deal_cards, evaluate_hand, compare_hands, select_best_three
+from ai import ai_decision
+from engine import BASE_BET, Table, ai_policy, simulate
+
+CARD_COUNTS = range(3, 14)
+SEAT_COUNTS = range(2, 13)
+TABLE_CARDS = 9
+SEED = 12345
+
+def _time(func, args_list, repeat, setup=None):
+    """对 args_list 中的每组参数调用 func，返回最快一次的平均单次耗时（秒）
+
+    setup 在每次重复前调用（不计时），用于清除缓存。
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / len(args_list)
+
+def _hands(num_cards, count, seed=SEED):
+    rng = random.Random(f"{seed}:{num_cards}")
+    return [rng.sample(range(52), num_cards) for _ in range(count)]
+
+def bench_evaluate_hand(size, repeat):
+    return {"3": _time(evaluate_hand, [(hand,) for hand in _hands(3, size)], repeat)}
+
+def bench_compare_hands(size, repeat):
+    hands = _hands(3, 2 * size)
+    return {"3": _time(compare_hands, list(zip(hands[::2], hands[1::2])), repeat)}
+
+def bench_select_best_three(size, repeat):
+    return {str(n): _time(select_best_three, [(hand,) for hand in _hands(n, size)], repeat) for n in CARD_COUNTS}
+
+def bench_deal_cards(size, repeat):
+    results = {}
+    for n in CARD_COUNTS:
+        rng = random.Random(SEED)
+        results[str(n)] = _time(deal_cards, [(4, n, rng)] * size, repeat)
+    return results
+
+def bench_dealer(size, repeat):
+    results = {}
+    for n in CARD_COUNTS:
+        dealer = Dealer(random.Random(SEED))
+        results[str(n)] = _time(dealer.deal, [(4, n)] * size, repeat)
+    return results
+
+def bench_ai_decision(size, repeat):
+    results = {}
+    for n in CARD_COUNTS:
+        rng = random.Random(SEED)
+        args_list = []
+        for i, hand in enumerate(_hands(n, size)):
+            table = Table(["AI", "P1"])
+            table.hands[0] = hand
+            table.seen[0] = i % 2
+            table.current_bet = BASE_BET + i % 30
+            table.pot = 40 + i % 100
+            table.round_num = 1 + i % 5
+            args_list.append((table, 0, rng))
+
+        def clear_cache():
+            for args in args_list:
+                args[0].infos[0] = None
+
+        # 每次重复前清除手牌缓存，测量的是每手牌第一次决策的耗时
+        results[str(n)] = _time(ai_decision, args_list, repeat, clear_cache)
+    return results
+
+def _bench_simulate(num_games, num_players, num_cards, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        simulate(num_games, num_cards, [ai_policy] * num_players, seed=SEED)
+        best = min(best, time.perf_counter() - start)
+    return best / num_games
+
+def bench_games(size, repeat):
+    """完整的4人 AI 对局，结果为每局耗时（秒）"""
+    num_games = max(1, size // 10)
+    return {str(n): _bench_simulate(num_games, 4, n, repeat) for n in CARD_COUNTS}
+
+def bench_seats(size, repeat):
+    """每人 TABLE_CARDS 张牌、2-12 人的 AI 对局（多于 52 张时使用多副牌），结果按人数列出"""
+    num_games = max(1, size // 10)
+    return {str(n): _bench_simulate(num_games, n, TABLE_CARDS, repeat) for n in SEAT_COUNTS}
+
+BENCHMARKS = {
+    "evaluate_hand": bench_evaluate_hand,
+    "compare_hands": bench_compare_hands,
+    "select_best_three": bench_select_best_three,
+    "deal_cards": bench_deal_cards,
+    "dealer": bench_dealer,
+    "ai_decision": bench_ai_decision,
+    "games": bench_games,
+    "seats": bench_seats,
+}
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(names, size, repeat):
+    """运行指定的基准测试，返回结果字典（耗时单位为秒/次）"""
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": SEED,
+        "size": size,
+        "repeat": repeat,
+        "results": {name: BENCHMARKS[name](size, repeat) for name in names},
+    }
+
+def compare(old, new):
+    """打印两次结果的对比，比值大于1表示变快"""
+    print(f"{'benchmark':<20}{'case':>6}{'old (us)':>12}{'new (us)':>12}{'speedup':>10}")
+    for name, cases in new["results"].items():
+        for num_cards, seconds in cases.items():
+            old_seconds = old["results"].get(name, {}).get(num_cards)
+            if old_seconds is None:
+                continue
+            print(f"{name:<20}{num_cards:>6}{old_seconds * 1e6:>12.2f}{seconds * 1e6:>12.2f}"
+                  f"{old_seconds / seconds:>10.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"要运行的基准测试，默认全部：{', '.join(BENCHMARKS)}")
+    parser.add_argument("--size", type=int, default=2000, help="每项测试的调用次数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    parser.add_argument("--output", help="把 JSON 结果写入文件（默认输出到标准输出）")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比较两个 JSON 结果文件")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        compare(old, new)
+        return
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知的基准测试: {', '.join(unknown)}")
+    result = run(args.names or list(BENCHMARKS), args.size, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
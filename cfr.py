@@ -0,0 +1,310 @@
+"""炸金花策略训练（CFR）
+
+在抽象后的下注规则上用反事实遗憾最小化训练一个混合策略，行动集合与引擎相同
+（看牌 / 跟注 / 加注 / 弃牌 / 比牌）。信息集由以下部分组成：
+
+    牌力档位   按压缩牌力（牌型 + 比较点数）落在 BUCKET_BOUNDS 的哪一段
+    轮数       1、2、3 及以后
+    阶段       未看牌、已看牌、第一轮刚看牌（只能跟注/加注/弃牌）
+    跟注金额   不超过底注、不超过3倍底注、更高
+    对手数     1、2、3 个及以上
+
+每次迭代按当前策略自我对局：随机选一个座位为遍历者，遍历者每次决策时，对每个合法行动
+用 Table.fork 复制牌局并按当前策略打完（rollout），得到各行动的结束筹码，
+遗憾为各行动的价值减去按当前策略的期望价值。对局按块分配到进程池，每块返回遗憾和策略的累加矩阵，
+主进程用 NumPy 一次性累加并做遗憾匹配（CFR+：遗憾截断为非负，平均策略按迭代次数线性加权）。
+
+训练得到的平均策略量化为 uint8 写入 policy.bin（每种发牌数一张表），policy_decision 读取该表，
+与 ai_decision 的参数和返回值相同；没有表、座位数与训练时不同、发牌数未训练或信息集从未出现时
+退回 ai_decision。
+
+    python cfr.py --cards 3 --players 4 --iterations 50 --processes 8
+"""
+import os
+import random
+import struct
+from array import array
+from bisect import bisect_right
+
+from rules import pack_strength
+from ai import ai_decision
+from engine import Table, START_CHIPS, start_game, next_seat, apply_action, rollout, complete_action
+from parallel import ChunkRunner
+
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "policy.bin")
+POLICY_MAGIC = b"ZJP1"
+# 文件头：魔数、最少/最多发牌数、行动数、训练时的座位数、每种发牌数的信息集数；
+# 之后为 uint8 概率（0-255），下标为 ((发牌数 - 最少发牌数) * 信息集数 + 信息集) * 行动数 + 行动
+_HEADER = struct.Struct("<4sBBBBH2x")
+MIN_CARDS = 3
+MAX_CARDS = 13
+
+ACTIONS = ("see", "call", "raise", "fold", "compare")
+NUM_ACTIONS = len(ACTIONS)
+SEE, CALL, RAISE, FOLD, COMPARE = range(NUM_ACTIONS)
+
+# 牌力档位的下界（压缩牌力），从小到大
+BUCKET_BOUNDS = [
+    pack_strength(0, (0, 0, 0)), pack_strength(0, (9, 0, 0)), pack_strength(0, (11, 0, 0)),
+    pack_strength(0, (12, 0, 0)),
+    pack_strength(1, (0, 0)), pack_strength(1, (5, 0)), pack_strength(1, (9, 0)), pack_strength(1, (12, 0)),
+    pack_strength(2, (0, 0, 0)), pack_strength(2, (8, 0, 0)),
+    pack_strength(3, (0, 0, 0)), pack_strength(3, (11, 0, 0)), pack_strength(3, (12, 0, 0)),
+    pack_strength(3, (12, 10, 0)),
+    pack_strength(4, (0, 0, 0)),
+    pack_strength(5, (0, 0, 0)), pack_strength(5, (9, 9, 9)),
+]
+NUM_BUCKETS = len(BUCKET_BOUNDS)
+NUM_INFOSETS = NUM_BUCKETS * 3 * 3 * 3 * 3
+
+def infoset(table, seat):
+    """座位 seat 当前的信息集编号"""
+    bucket = bisect_right(BUCKET_BOUNDS, table.hand_info(seat).strength) - 1
+    round_index = min(table.round_num, 3) - 1
+    phase = 2 if table.after_see else table.seen[seat]
+    current_bet = table.current_bet
+    bet_level = 0 if current_bet <= table.base_bet else 1 if current_bet <= 3 * table.base_bet else 2
+    opponents = min(table.num_active - 1, 3) - 1
+    return (((bucket * 3 + round_index) * 3 + phase) * 3 + bet_level) * 3 + opponents
+
+def legal_mask(table, seat):
+    """按 ACTIONS 的顺序返回各行动是否合法（与 engine.legal_options 相同）"""
+    if table.after_see:
+        return (False, True, True, True, False)
+    return (not table.seen[seat], True, True, True, table.round_num >= 2)
+
+def _sample(weights, legal, rng):
+    """按权重抽取一个合法行动，权重全为 0 时在合法行动中均匀抽取"""
+    total = 0.0
+    for weight, allowed in zip(weights, legal):
+        if allowed:
+            total += weight
+    if total <= 0:
+        return rng.choice([action for action in range(NUM_ACTIONS) if legal[action]])
+    point = rng.random() * total
+    for action in range(NUM_ACTIONS):
+        if legal[action]:
+            point -= weights[action]
+            if point < 0:
+                return action
+    return max(action for action in range(NUM_ACTIONS) if legal[action])
+
+class _StrategyPolicy:
+    """按策略矩阵（嵌套列表）行动的引擎策略，用于训练时的自我对局和 rollout"""
+
+    __slots__ = ("strategy",)
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def __call__(self, table, seat):
+        action = _sample(self.strategy[infoset(table, seat)], legal_mask(table, seat), table.rng)
+        return complete_action(table, seat, ACTIONS[action])
+
+def _train_chunk(args):
+    """自我对局 num_games 局，返回 (遗憾累加矩阵, 策略累加矩阵)，形状都是 (NUM_INFOSETS, NUM_ACTIONS)"""
+    import numpy as np
+
+    strategy, num_players, num_cards, seed, iteration, chunk_index, num_games = args
+    rng = random.Random(f"{seed}:{iteration}:{chunk_index}")
+    strategy = strategy.tolist()
+    policy = _StrategyPolicy(strategy)
+    policies = [policy] * num_players
+    table = Table([f"P{i}" for i in range(num_players)])
+    start_chips = array("l", [START_CHIPS] * num_players)
+    visited = []
+    regret_rows = []
+    strategy_rows = []
+    for game in range(num_games):
+        table.chips[:] = start_chips
+        shift = game % num_players
+        if not start_game(table, list(range(shift, num_players)) + list(range(shift)), num_cards, rng, sink=None):
+            raise ValueError("无法开局")
+        traverser = rng.randrange(num_players)
+        while True:
+            seat = next_seat(table)
+            if seat is None:
+                break
+            if seat != traverser:
+                action, arg = policy(table, seat)
+                apply_action(table, seat, action, arg)
+                continue
+            info = infoset(table, seat)
+            legal = legal_mask(table, seat)
+            weights = strategy[info]
+            total = sum(weight for weight, allowed in zip(weights, legal) if allowed)
+            count = sum(legal)
+            sigma = [(weights[a] / total if total > 0 else 1.0 / count) if legal[a] else 0.0
+                     for a in range(NUM_ACTIONS)]
+            # 每个合法行动在复制的牌局上按当前策略打完，弃牌后筹码不再变化，不用模拟
+            values = [0.0] * NUM_ACTIONS
+            for a in range(NUM_ACTIONS):
+                if not legal[a]:
+                    continue
+                if a == FOLD:
+                    values[a] = table.chips[seat]
+                    continue
+                after = table.fork()
+                apply_action(after, seat, *complete_action(after, seat, ACTIONS[a]))
+                rollout(after, policies)
+                values[a] = after.chips[seat]
+            expected = sum(s * v for s, v in zip(sigma, values))
+            visited.append(info)
+            regret_rows.append([values[a] - expected if legal[a] else 0.0 for a in range(NUM_ACTIONS)])
+            strategy_rows.append(sigma)
+            action = _sample(sigma, legal, rng)
+            apply_action(table, seat, *complete_action(table, seat, ACTIONS[action]))
+
+    regrets = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+    strategy_sums = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+    if visited:
+        index = np.array(visited)
+        np.add.at(regrets, index, np.array(regret_rows))
+        np.add.at(strategy_sums, index, np.array(strategy_rows))
+    return regrets, strategy_sums
+
+def regret_matching(regrets):
+    """由累计遗憾得到当前策略：正遗憾归一化，没有正遗憾的信息集取均匀策略"""
+    import numpy as np
+
+    positive = np.maximum(regrets, 0.0)
+    totals = positive.sum(axis=1, keepdims=True)
+    return np.where(totals > 0, positive / np.where(totals > 0, totals, 1.0), 1.0 / NUM_ACTIONS)
+
+def train(num_cards, num_players=4, iterations=50, games_per_chunk=200, chunks=None, seed=0, processes=1,
+          pool=None, progress=None):
+    """训练 num_cards 张牌、num_players 人时的策略，返回平均策略矩阵 (NUM_INFOSETS, NUM_ACTIONS)
+
+    每次迭代打 chunks（默认为进程数）块、每块 games_per_chunk 局；processes 和 pool 的用法见
+    parallel.ChunkRunner。从未访问的信息集整行为 0。progress(迭代次数, 遗憾矩阵) 在每次迭代后调用。
+    """
+    import numpy as np
+
+    regrets = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+    strategy_sums = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+    with ChunkRunner(processes, pool) as runner:
+        if chunks is None:
+            chunks = runner.wave_size
+        for iteration in range(1, iterations + 1):
+            strategy = regret_matching(regrets)
+            work = [(strategy, num_players, num_cards, seed, iteration, chunk, games_per_chunk)
+                    for chunk in range(chunks)]
+            for chunk_regrets, chunk_strategy_sums in runner.map(_train_chunk, work):
+                regrets += chunk_regrets
+                strategy_sums += iteration * chunk_strategy_sums
+            np.maximum(regrets, 0.0, out=regrets)
+            if progress:
+                progress(iteration, regrets)
+
+    totals = strategy_sums.sum(axis=1, keepdims=True)
+    return strategy_sums / np.where(totals > 0, totals, 1.0)
+
+def write_policy(policies, path=POLICY_FILE, num_players=4):
+    """把 {发牌数: 平均策略矩阵} 量化后写入文件，未训练的发牌数整张表为 0"""
+    import numpy as np
+
+    data = np.zeros((MAX_CARDS - MIN_CARDS + 1, NUM_INFOSETS, NUM_ACTIONS), dtype=np.uint8)
+    for num_cards, policy in policies.items():
+        data[num_cards - MIN_CARDS] = np.rint(np.clip(policy, 0.0, 1.0) * 255)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(POLICY_MAGIC, MIN_CARDS, MAX_CARDS, NUM_ACTIONS, num_players, NUM_INFOSETS))
+        f.write(data.tobytes())
+    os.replace(tmp_path, path)
+
+class PolicyTable:
+    """训练好的策略表，decision 可以代替 ai_decision"""
+
+    __slots__ = ("data", "min_cards", "max_cards", "num_players")
+
+    def __init__(self, path=POLICY_FILE):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, min_cards, max_cards, num_actions, num_players, num_infosets = _HEADER.unpack_from(data)
+        size = (max_cards - min_cards + 1) * num_infosets * num_actions
+        if (magic != POLICY_MAGIC or num_actions != NUM_ACTIONS or num_infosets != NUM_INFOSETS
+                or len(data) != _HEADER.size + size):
+            raise ValueError(f"无效的策略文件: {path}")
+        self.data = data
+        self.min_cards = min_cards
+        self.max_cards = max_cards
+        self.num_players = num_players
+
+    def decision(self, table, seat, rng=random):
+        """与 ai_decision 相同的参数和返回值；座位数与训练时不同或表中没有对应的策略时调用 ai_decision"""
+        num_cards = len(table.hands[seat])
+        if len(table.names) == self.num_players and self.min_cards <= num_cards <= self.max_cards:
+            offset = _HEADER.size + ((num_cards - self.min_cards) * NUM_INFOSETS + infoset(table, seat)) * NUM_ACTIONS
+            weights = self.data[offset:offset + NUM_ACTIONS]
+            legal = legal_mask(table, seat)
+            if any(weight and allowed for weight, allowed in zip(weights, legal)):
+                return ACTIONS[_sample(weights, legal, rng)]
+        return ai_decision(table, seat, rng)
+
+def load_policy(path=POLICY_FILE):
+    """读取策略文件；不存在或无效时返回 None"""
+    try:
+        return PolicyTable(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+_NOT_LOADED = object()
+policy_table = _NOT_LOADED
+
+def policy_decision(table, seat, rng=random):
+    """ai_decision 的替代：按 policy.bin 中训练好的策略决策，没有该文件时就是 ai_decision"""
+    global policy_table
+    if policy_table is _NOT_LOADED:
+        policy_table = load_policy()
+    if policy_table is None:
+        return ai_decision(table, seat, rng)
+    return policy_table.decision(table, seat, rng)
+
+def cfr_policy(table, seat):
+    """使用训练好的策略的引擎策略回调"""
+    return complete_action(table, seat, policy_decision(table, seat, table.rng))
+
+def main(argv=None):
+    import argparse
+    import time
+
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="训练炸金花策略表")
+    parser.add_argument("--cards", type=int, nargs="+", default=[3], help="要训练的每人发牌数量")
+    parser.add_argument("--players", type=int, default=4, help="座位数")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--games", type=int, default=200, help="每块的对局数")
+    parser.add_argument("--chunks", type=int, default=None, help="每次迭代的块数，默认为进程数")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=POLICY_FILE)
+    args = parser.parse_args(argv)
+    if any(not MIN_CARDS <= num_cards <= MAX_CARDS for num_cards in args.cards):
+        parser.error(f"每人发牌数量应为 {MIN_CARDS} 到 {MAX_CARDS}")
+
+    existing = load_policy(args.output)
+    policies = {}
+    if existing is not None and existing.num_players == args.players:
+        # 保留文件中其他发牌数的策略（座位数不同的策略不能混在同一个文件里）
+        data = np.frombuffer(existing.data, dtype=np.uint8, offset=_HEADER.size)
+        data = data.reshape(existing.max_cards - existing.min_cards + 1, NUM_INFOSETS, NUM_ACTIONS)
+        for index, table in enumerate(data):
+            if table.any():
+                policies[existing.min_cards + index] = table / 255.0
+
+    with ChunkRunner(args.processes) as runner:
+        for num_cards in args.cards:
+            start = time.perf_counter()
+
+            def progress(iteration, regrets, num_cards=num_cards):
+                if iteration % 10 == 0 or iteration == args.iterations:
+                    print(f"{num_cards} 张牌: 第 {iteration} 次迭代, 用时 {time.perf_counter() - start:.1f} 秒")
+
+            policies[num_cards] = train(num_cards, args.players, args.iterations, args.games, args.chunks,
+                                        args.seed, args.processes, runner.pool, progress)
+    write_policy(policies, args.output, args.players)
+    print(f"已写入 {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+import random
+from array import array
+from time import perf_counter
+
+from rules import HandInfo, Dealer, decks_needed, evaluate_hand, hand_strength, select_best_three
+from ai import THRESHOLDS, ai_decision
+from events import (ACTIONS, RESULTS, Abort, RoundStart, Ante, See, Call, Raise, Fold, CompareBet, Compare,
+                    Showdown, PotAward)
+
+# 无界面的炸金花引擎：不读输入也不打印，每个座位（包括 0 号）的行动都由策略回调决定，
+# 过程通过 events 中的事件输出，便于大规模模拟。main.play_single_game 也基于它实现。
+BASE_BET = 10
+MAX_ROUNDS = 5
+START_CHIPS = 100
+
+class Table:
+    """一张牌桌的全部状态
+
+    座位数据按数组存放（chips、folded、seen 等按座位编号索引），筹码和名字跨局保留，
+    其余字段由 start_game 在每局开始时重置。
+    """
+
+    __slots__ = ("names", "chips", "hands", "infos", "folded", "seen", "has_called", "num_active",
+                 "action_order", "rng", "dealer", "base_bet", "pot", "current_bet", "round_num", "turn", "after_see",
+                 "log", "log_results", "stats")
+
+    def __init__(self, names, chips=START_CHIPS):
+        num_seats = len(names)
+        self.names = list(names)
+        self.chips = array("l", [chips] * num_seats)
+        self.hands = [None] * num_seats
+        self.infos = [None] * num_seats       # 每个座位手牌的 HandInfo 缓存，发牌时清空
+        self.folded = bytearray(num_seats)
+        self.seen = bytearray(num_seats)
+        self.has_called = bytearray(num_seats)
+        self.num_active = num_seats           # 未弃牌的座位数
+        self.action_order = list(range(num_seats))
+        self.rng = random
+        self.dealer = None                    # 本桌的发牌器，随 rng 创建
+        self.base_bet = BASE_BET
+        self.pot = 0
+        self.current_bet = 0
+        self.round_num = 0
+        self.turn = 0                         # 当前轮在 action_order 中的位置
+        self.after_see = False                # 第一轮刚看牌，同一玩家必须继续跟注/加注/弃牌
+        self.log = None
+        self.log_results = None
+        self.stats = None                     # instrument.Stats，开启计数和计时时设置
+
+    def hand_info(self, seat):
+        """座位手牌的最佳3张、评估结果和压缩牌力，每手牌只计算一次"""
+        info = self.infos[seat]
+        stats = self.stats
+        if info is None:
+            hand = self.hands[seat]
+            if stats is None:
+                best = select_best_three(hand)
+                score = evaluate_hand(best)
+            else:
+                stats.miss("hand_info")
+                start = perf_counter()
+                best = select_best_three(hand)
+                middle = perf_counter()
+                score = evaluate_hand(best)
+                stats.add("select_best_three", middle - start)
+                stats.add("evaluate_hand", perf_counter() - middle)
+            info = self.infos[seat] = HandInfo(hand, best, score, hand_strength(best))
+        elif stats is not None:
+            stats.hit("hand_info")
+        return info
+
+    def fork(self, rng=None):
+        """复制当前牌局状态，用于向前搜索和模拟
+
+        只复制会被修改的按座位数组（筹码、弃牌、看牌等，长度为座位数）和手牌缓存列表，
+        名字、手牌和行动顺序在局内不会原地修改，与原牌桌共享。副本不输出事件、不做统计，
+        rng 为副本决策使用的随机数生成器（默认与原牌桌相同）。
+        """
+        other = Table.__new__(Table)
+        other.names = self.names
+        other.chips = self.chips[:]
+        other.hands = self.hands
+        other.infos = self.infos[:]
+        other.folded = self.folded[:]
+        other.seen = self.seen[:]
+        other.has_called = self.has_called[:]
+        other.num_active = self.num_active
+        other.action_order = self.action_order
+        other.rng = self.rng if rng is None else rng
+        other.dealer = None
+        other.base_bet = self.base_bet
+        other.pot = self.pot
+        other.current_bet = self.current_bet
+        other.round_num = self.round_num
+        other.turn = self.turn
+        other.after_see = self.after_see
+        other.log = None
+        other.log_results = None
+        other.stats = None
+        return other
+
+    def active_opponents(self, seat):
+        """按座位顺序列出未弃牌的对手"""
+        folded = self.folded
+        return [i for i in range(len(folded)) if not folded[i] and i != seat]
+
+def start_game(table, action_order, num_cards, rng=random, base_bet=BASE_BET, sink=None, verbosity=ACTIONS,
+               num_decks=None):
+    """重置牌桌、发牌并收底注，返回是否成功开局；牌数不足或有人付不起底注时返回 False
+
+    sink 接收 events 中定义的事件，verbosity 控制产生哪些事件。
+    num_decks 为 None 时按座位数和发牌数自动使用足够的副数（decks_needed）。
+    """
+    log = sink.emit if sink is not None and verbosity >= ACTIONS else None
+    log_results = sink.emit if sink is not None and verbosity >= RESULTS else None
+    num_seats = len(table.names)
+    table.hands = [None] * num_seats
+    table.infos = [None] * num_seats
+    table.folded = bytearray(num_seats)
+    table.seen = bytearray(num_seats)
+    table.has_called = bytearray(num_seats)
+    table.log = log
+    table.log_results = log_results
+
+    if num_decks is None:
+        num_decks = decks_needed(num_seats, num_cards)
+    dealer = table.dealer
+    if dealer is None or dealer.rng is not rng or dealer.num_decks != num_decks:
+        table.dealer = Dealer(rng, num_decks)
+    stats = table.stats
+    start = perf_counter() if stats is not None else 0.0
+    try:
+        hands = table.dealer.deal(num_seats, num_cards)
+    except ValueError:
+        if log_results:
+            log_results(Abort("deal", None))
+        return False
+    if stats is not None:
+        stats.add("deal", perf_counter() - start)
+    chips = table.chips
+    for seat in range(num_seats):
+        if chips[seat] < base_bet:
+            if log_results:
+                log_results(Abort("chips", table.names[seat]))
+            return False
+    table.hands = hands
+    for seat in range(num_seats):
+        chips[seat] -= base_bet
+        if log:
+            log(Ante(seat, table.names[seat], base_bet, chips[seat]))
+
+    table.num_active = num_seats
+    table.action_order = action_order
+    table.rng = rng
+    table.base_bet = base_bet
+    table.pot = base_bet * num_seats
+    table.current_bet = base_bet
+    table.round_num = 1
+    table.turn = 0
+    table.after_see = False
+    if log:
+        _log_round_start(table)
+    return True
+
+def _log_round_start(table):
+    table.log(RoundStart(table.round_num, table.pot, table.current_bet, [table.names[i] for i in table.action_order]))
+
+def next_seat(table):
+    """返回下一个需要行动的座位；本局下注结束时返回 None"""
+    action_order = table.action_order
+    if table.after_see:
+        return action_order[table.turn]
+    folded = table.folded
+    while True:
+        if table.num_active <= 1:
+            return None
+        if table.turn >= len(action_order):
+            if table.round_num >= MAX_ROUNDS:
+                return None
+            table.round_num += 1
+            table.turn = 0
+            table.has_called = bytearray(len(folded))
+            if table.log:
+                _log_round_start(table)
+        seat = action_order[table.turn]
+        if not folded[seat]:
+            return seat
+        table.turn += 1
+
+def _fold(table, seat):
+    table.folded[seat] = 1
+    table.num_active -= 1
+
+def _pay(table, seat, bet):
+    """下注 bet，筹码不足时自动弃牌，返回是否成功"""
+    chips = table.chips
+    if chips[seat] >= bet:
+        chips[seat] -= bet
+        table.pot += bet
+        return True
+    _fold(table, seat)
+    if table.log:
+        table.log(Fold(seat, table.names[seat], True))
+    return False
+
+def legal_options(table, seat):
+    """列出座位当前可以选择的行动"""
+    if table.after_see:
+        return ["call", "raise", "fold"]
+    options = [] if table.seen[seat] else ["see"]
+    options += ["call", "raise", "fold"]
+    if table.round_num >= 2:
+        options.append("compare")
+    return options
+
+def apply_action(table, seat, action, arg=None):
+    """执行座位 seat 的行动：see / call / raise(arg=加注额) / fold / compare(arg=对手座位)
+
+    比牌时返回比较结果（>0 发起者赢，<0 输，0 平局），其他行动返回 None。
+    """
+    seen = table.seen[seat]
+    # 先检查行动是否合法，再修改牌桌状态
+    if table.after_see and action not in ("call", "raise", "fold"):
+        raise ValueError(f"看牌后只能跟注、加注或弃牌: {action}")
+    if action == "see" and seen:
+        raise ValueError("已经看过牌")
+    if action == "compare":
+        if table.round_num < 2:
+            raise ValueError("第二轮起才能比牌")
+        if not isinstance(arg, int) or not 0 <= arg < len(table.folded) or arg == seat or table.folded[arg]:
+            raise ValueError(f"无效的比牌对手: {arg}")
+    elif action not in ("see", "call", "raise", "fold"):
+        raise ValueError(f"未知行动: {action}")
+
+    log = table.log
+    table.after_see = False
+    table.turn += 1
+    multiplier = 2 if seen else 1
+
+    if action == "see":
+        table.seen[seat] = 1
+        if log:
+            log(See(seat, table.names[seat], table.hands[seat], table.hand_info(seat).best))
+        if table.round_num == 1:
+            # 第一轮看牌后，必须选择跟注、加注或弃牌
+            table.after_see = True
+            table.turn -= 1
+    elif action == "call":
+        bet = table.current_bet * multiplier
+        if _pay(table, seat, bet):
+            table.has_called[seat] = 1
+            if log:
+                log(Call(seat, table.names[seat], bet, table.chips[seat]))
+    elif action == "raise":
+        min_raise = table.current_bet * 2 if seen else table.current_bet + 10
+        if arg is None or arg < min_raise:
+            return None  # 加注金额不足，本次不行动
+        bet = arg * multiplier
+        if _pay(table, seat, bet):
+            table.current_bet = arg
+            table.has_called[seat] = 1  # 加注也算跟注
+            if log:
+                log(Raise(seat, table.names[seat], bet, table.chips[seat], arg))
+    elif action == "fold":
+        _fold(table, seat)
+        if log:
+            log(Fold(seat, table.names[seat], False))
+    else:
+        bet = table.current_bet * multiplier
+        for payer in (seat, arg):
+            if not _pay(table, payer, bet):
+                return None
+            if log:
+                log(CompareBet(payer, table.names[payer], bet, table.chips[payer]))
+        stats = table.stats
+        start = perf_counter() if stats is not None else 0.0
+        player_info = table.hand_info(seat)
+        opponent_info = table.hand_info(arg)
+        result = (player_info.strength > opponent_info.strength) - (player_info.strength < opponent_info.strength)
+        if stats is not None:
+            stats.add("compare_hands", perf_counter() - start)
+        if log:
+            log(Compare(seat, table.names[seat], arg, table.names[arg], player_info.best, opponent_info.best, result))
+        if result > 0:
+            _fold(table, arg)
+        elif result < 0:
+            _fold(table, seat)
+        return result
+    return None
+
+def settle(table):
+    """比牌分配底池，返回赢家座位列表
+
+    每个座位的压缩牌力只算一次，赢家为牌力等于最大值的所有座位，平局平分底池。
+    """
+    stats = table.stats
+    start = perf_counter() if stats is not None else 0.0
+    folded = table.folded
+    active_seats = [seat for seat in range(len(folded)) if not folded[seat]]
+    if len(active_seats) == 1:
+        winners = active_seats
+    else:
+        strengths = [table.hand_info(seat).strength for seat in active_seats]
+        best_strength = max(strengths)
+        winners = [seat for seat, strength in zip(active_seats, strengths) if strength == best_strength]
+    share = table.pot // len(winners)
+    for seat in winners:
+        table.chips[seat] += share
+    if stats is not None:
+        stats.add("showdown", perf_counter() - start)
+    if table.log_results:
+        _log_results(table, winners, share, len(active_seats) > 1)
+    return winners
+
+def _log_results(table, winners, share, contested):
+    revealed = []
+    for seat, name in enumerate(table.names):
+        folded = bool(table.folded[seat])
+        if table.hands[seat]:
+            info = table.hand_info(seat)
+            revealed.append((seat, name, folded, table.hands[seat], info.best, info.score[2]))
+        else:
+            revealed.append((seat, name, folded, table.hands[seat], [], "无牌"))
+    table.log_results(Showdown(revealed))
+    table.log_results(PotAward(winners, [table.names[seat] for seat in winners], share, table.pot, contested))
+
+def successor(table, seat, action, arg=None, rng=None):
+    """返回执行行动后的新牌桌，原牌桌不变"""
+    other = table.fork(rng)
+    apply_action(other, seat, action, arg)
+    return other
+
+def rollout(table, policies):
+    """用策略回调把牌桌上的这一局打完并结算，返回赢家座位列表（直接修改 table，需要时先 fork）"""
+    while True:
+        seat = next_seat(table)
+        if seat is None:
+            break
+        action, arg = policies[seat](table, seat)
+        apply_action(table, seat, action, arg)
+    return settle(table)
+
+def ai_policy(table, seat):
+    """内置 AI 策略，包装 ai_decision 并补上加注金额和比牌对手"""
+    return complete_action(table, seat, ai_decision(table, seat, table.rng))
+
+class AIPolicy:
+    """使用自定义阈值的内置 AI 策略（见 ai.Thresholds），thresholds 为 None 时按牌型决策
+
+    实例只保存阈值，可以 pickle 后传给进程池。
+    """
+
+    __slots__ = ("thresholds",)
+
+    def __init__(self, thresholds=THRESHOLDS):
+        self.thresholds = thresholds
+
+    def __call__(self, table, seat):
+        return complete_action(table, seat, ai_decision(table, seat, table.rng, self.thresholds))
+
+    def __repr__(self):
+        return f"AIPolicy({self.thresholds!r})"
+
+def complete_action(table, seat, action):
+    rng = table.rng
+    if action == "raise":
+        current_bet = table.current_bet
+        return action, current_bet * 2 if table.seen[seat] else current_bet + rng.randint(10, 20)
+    if action == "compare":
+        return action, rng.choice(table.active_opponents(seat))
+    return action, None
+
+def play_hand(table, action_order, num_cards, policies, rng=random, sink=None, verbosity=ACTIONS, num_decks=None):
+    """用策略回调打完一局，返回赢家座位列表；无法开局时返回 None
+
+    policies[seat](table, seat) 返回 (行动, 参数)，table.after_see 为真时只能跟注、加注或弃牌。
+    """
+    stats = table.stats
+    start = perf_counter() if stats is not None else 0.0
+    if not start_game(table, action_order, num_cards, rng, sink=sink, verbosity=verbosity, num_decks=num_decks):
+        return None
+    while True:
+        seat = next_seat(table)
+        if seat is None:
+            break
+        if stats is None:
+            action, arg = policies[seat](table, seat)
+        else:
+            stats.round_iteration(table.round_num)
+            decision_start = perf_counter()
+            action, arg = policies[seat](table, seat)
+            stats.add("decision", perf_counter() - decision_start)
+        apply_action(table, seat, action, arg)
+    winners = settle(table)
+    if stats is not None:
+        stats.add("game", perf_counter() - start)
+    return winners
+
+def simulate(num_games, num_cards, policies, seed=None, chips=START_CHIPS, num_decks=None, sink=None,
+             verbosity=ACTIONS, stats=None):
+    """每局重新发筹码、轮转行动顺序，连续模拟 num_games 局，返回各座位累计输赢筹码
+
+    座位数等于 policies 的长度，牌不够时自动使用多副牌（见 start_game）。
+    传入 sink 时按 verbosity 产生事件，例如用 history.HistoryWriter 记录牌谱；
+    传入 instrument.Stats 时累计各阶段的计数和耗时。
+    """
+    rng = random.Random(seed)
+    num_players = len(policies)
+    net = [0] * num_players
+    table = Table([f"P{i}" for i in range(num_players)], chips)
+    table.stats = stats
+    start_chips = array("l", [chips] * num_players)
+    for game in range(num_games):
+        table.chips[:] = start_chips
+        shift = game % num_players
+        action_order = list(range(shift, num_players)) + list(range(shift))
+        if play_hand(table, action_order, num_cards, policies, rng, sink, verbosity, num_decks) is None:
+            raise ValueError("牌数过多或筹码不足，无法开局")
+        for i in range(num_players):
+            net[i] += table.chips[i] - chips
+    return net
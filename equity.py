@@ -0,0 +1,76 @@
+import math
+import random
+from statistics import NormalDist
+
+from rules import deck, decks_needed, hand_strength, select_best_three
+from parallel import ChunkRunner
+
+# 蒙特卡洛胜率估计：从剩余的牌中随机补齐自己的手牌并给对手发牌，统计胜/平/负的比例。
+# 抽样按块分配到进程池，每块使用由 (seed, 块编号) 确定的独立随机数流，
+# 按块的顺序汇总并在置信区间达到目标后提前停止，因此结果与进程数无关、可以复现。
+CHUNK_SIZE = 2000
+
+def _sample_chunk(args):
+    """抽样一块，返回 (胜, 平, 负) 局数"""
+    hand, remaining, num_opponents, num_cards, seed, chunk_index, size = args
+    rng = random.Random(f"{seed}:{chunk_index}")
+    missing = num_cards - len(hand)
+    need = missing + num_opponents * num_cards
+    wins = ties = losses = 0
+    for _ in range(size):
+        drawn = rng.sample(remaining, need)
+        strength = hand_strength(select_best_three(hand + drawn[:missing]))
+        best_opponent = max(hand_strength(select_best_three(drawn[i:i + num_cards]))
+                            for i in range(missing, need, num_cards))
+        if strength > best_opponent:
+            wins += 1
+        elif strength == best_opponent:
+            ties += 1
+        else:
+            losses += 1
+    return wins, ties, losses
+
+def estimate_equity(hand, num_opponents, num_cards, seed=0, target_ci=0.005, confidence=0.95,
+                    min_samples=4 * CHUNK_SIZE, max_samples=500000, processes=1, pool=None, chunk_size=CHUNK_SIZE,
+                    num_decks=None):
+    """估计手牌 hand（可以少于 num_cards 张）对 num_opponents 个对手的胜/平/负概率
+
+    当胜、平、负比例的置信区间半宽都不超过 target_ci（且至少抽样 min_samples 局）时停止，最多 max_samples 局。
+    processes > 1 时新建进程池并行抽样；每次决策都要调用时可传入已有的 pool 复用进程，
+    用法见 parallel.ChunkRunner。
+    num_decks 为 None 时按人数和发牌数自动使用足够的副数，与 engine.start_game 一致。
+    返回字典 {"win", "tie", "lose", "samples", "ci"}。
+    """
+    hand = list(hand)
+    if num_opponents < 1 or num_cards < 3:
+        raise ValueError("至少需要1个对手，每人至少3张牌")
+    if num_decks is None:
+        num_decks = decks_needed(num_opponents + 1, num_cards)
+    if len(hand) > num_cards or any(hand.count(card) > num_decks for card in hand):
+        raise ValueError(f"无效的手牌: {hand}")
+    remaining = deck * num_decks
+    for card in hand:
+        remaining.remove(card)
+    if num_cards - len(hand) + num_opponents * num_cards > len(remaining):
+        raise ValueError("牌数不足")
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    num_chunks = max(1, math.ceil(max_samples / chunk_size))
+    wins = ties = losses = 0
+    half_width = 1.0
+    with ChunkRunner(processes, pool) as runner:
+        chunks = runner.chunks(_sample_chunk, lambda i: (hand, remaining, num_opponents, num_cards, seed, i,
+                                                         min(chunk_size, max_samples - i * chunk_size)), num_chunks)
+        for chunk_wins, chunk_ties, chunk_losses in chunks:
+            wins += chunk_wins
+            ties += chunk_ties
+            losses += chunk_losses
+            samples = wins + ties + losses
+            half_width = max(z * math.sqrt(p * (1 - p) / samples)
+                             for p in (wins / samples, ties / samples, losses / samples))
+            if samples >= min_samples and half_width <= target_ci:
+                break  # 达到精度，丢弃本批剩余的块
+
+    samples = wins + ties + losses
+    return {"win": wins / samples, "tie": ties / samples, "lose": losses / samples,
+            "samples": samples, "ci": half_width}
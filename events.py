@@ -0,0 +1,150 @@
+import json
+from collections import namedtuple
+
+from rules import format_hand
+
+# 结构化的牌局事件。引擎只在对应的详细程度开启时才创建事件，
+# 关闭时只多一次判断，批量模拟几乎没有日志开销。
+SILENT = 0    # 不产生事件
+RESULTS = 1   # 只有无法开局、亮牌和底池分配
+ACTIONS = 2   # 每一次下注、看牌、弃牌和比牌
+
+Abort = namedtuple("Abort", "reason name")
+RoundStart = namedtuple("RoundStart", "round_num pot current_bet order")
+Ante = namedtuple("Ante", "seat name amount chips")
+See = namedtuple("See", "seat name hand best")
+Call = namedtuple("Call", "seat name amount chips")
+Raise = namedtuple("Raise", "seat name amount chips current_bet")
+Fold = namedtuple("Fold", "seat name forced")
+CompareBet = namedtuple("CompareBet", "seat name amount chips")
+Compare = namedtuple("Compare", "seat name opponent opponent_name hand opponent_hand result")
+Showdown = namedtuple("Showdown", "players")  # 每项为 (座位, 名字, 是否弃牌, 手牌, 最佳3张, 牌型名称)
+PotAward = namedtuple("PotAward", "seats names amount pot contested")
+
+EVENT_TYPES = {kind.__name__: kind for kind in
+               (Abort, RoundStart, Ante, See, Call, Raise, Fold, CompareBet, Compare, Showdown, PotAward)}
+
+def event_to_dict(event):
+    """把事件转换成可序列化为 JSON 的字典"""
+    data = {"type": type(event).__name__}
+    data.update(event._asdict())
+    return data
+
+def event_from_dict(data):
+    """由 event_to_dict 的结果还原事件"""
+    fields = dict(data)
+    return EVENT_TYPES[fields.pop("type")](**fields)
+
+class NullSink:
+    """丢弃所有事件"""
+
+    def emit(self, event):
+        pass
+
+class ListSink:
+    """把事件保存在内存列表中"""
+
+    def __init__(self):
+        self.events = []
+        self.emit = self.events.append
+
+class TeeSink:
+    """把事件依次发给多个接收者"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink.emit(event)
+
+class ConsoleSink:
+    """按原来的中文文本把事件打印到控制台；human_seats 中的座位看牌时显示手牌"""
+
+    def __init__(self, human_seats=(0,)):
+        self.human_seats = human_seats
+
+    def emit(self, event):
+        for line in render(event, self.human_seats):
+            print(line)
+
+class FileSink:
+    """把事件按 JSON 行攒批写入文件"""
+
+    def __init__(self, path, batch_size=1000):
+        self.file = open(path, "a", encoding="utf-8")
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def emit(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write("".join(json.dumps(event_to_dict(event), ensure_ascii=False) + "\n"
+                                    for event in self.buffer))
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def render(event, human_seats=(0,)):
+    """返回事件对应的控制台文本行"""
+    kind = type(event)
+    if kind is Ante:
+        return [f"{event.name} 下底注: {event.amount}, 剩余筹码: {event.chips}"]
+    if kind is RoundStart:
+        return [f"\n=== 第 {event.round_num} 轮 ===",
+                f"当前底池: {event.pot}, 当前跟注金额: {event.current_bet}",
+                f"行动顺序: {' -> '.join(event.order)}"]
+    if kind is See:
+        if event.seat in human_seats:
+            return [f"你看了牌: {format_hand(event.hand)}",
+                    f"最佳3张牌（按炸金花规则）: {format_hand(event.best)}"]
+        return [f"{event.name} 看牌"]
+    if kind is Call:
+        return [f"{event.name} 跟注: {event.amount}, 剩余筹码: {event.chips}"]
+    if kind is Raise:
+        return [f"{event.name} 加注: {event.amount}, 剩余筹码: {event.chips}"]
+    if kind is Fold:
+        return [f"{event.name} 筹码不足，自动弃牌" if event.forced else f"{event.name} 弃牌"]
+    if kind is CompareBet:
+        return [f"{event.name} 因比牌下注: {event.amount}, 剩余筹码: {event.chips}"]
+    if kind is Compare:
+        lines = [f"\n比牌: {event.name} 的牌 {format_hand(event.hand)} vs {event.opponent_name} 的牌 {format_hand(event.opponent_hand)}"]
+        if event.result > 0:
+            lines.append(f"{event.name} 获胜！{event.opponent_name} 弃牌")
+        elif event.result < 0:
+            lines.append(f"{event.opponent_name} 获胜！{event.name} 弃牌")
+        else:
+            lines.append("平局！双方继续")
+        return lines
+    if kind is Showdown:
+        lines = ["\n=== 本局所有玩家牌 ==="]
+        for seat, name, folded, hand, best, category_name in event.players:
+            lines.append(f"{name} (状态: {'已弃牌' if folded else '未弃牌'})")
+            lines.append(f"  手牌: {format_hand(hand) if hand else None}")
+            lines.append(f"  最佳3张牌: {format_hand(best)}, 牌型: {category_name}")
+        return lines
+    if kind is PotAward:
+        lines = ["\n=== 比牌 ==="] if event.contested else []
+        if len(event.seats) == 1:
+            lines.append(f"\n{event.names[0]} 获胜，赢得底池: {event.pot}")
+        else:
+            lines.extend(f"\n{name} 平局，赢得底池部分: {event.amount}" for name in event.names)
+        return lines
+    if kind is Abort:
+        if event.reason == "deal":
+            return ["牌数过多，无法发牌！游戏结束"]
+        return [f"{event.name} 筹码不足，无法继续游戏"]
+    return [repr(event)]
@@ -0,0 +1,204 @@
+"""炸金花二进制牌谱
+
+只追加的紧凑格式：8 字节文件头之后全部是 8 字节的定长记录 (类型 u8, 座位 u8, 参数 u16, 金额 i32，小端)，
+可以用 mmap 顺序读取或筛选，不需要把整个文件读入内存；装有 NumPy 时还可以把整个文件
+看作结构化数组做向量化统计。
+
+每局按以下顺序写入，只有完整结束的牌局才会写入文件：
+
+    GAME     座位=座位数, 参数=每人牌数, 金额=底注
+    CARDS    座位=座位号, 其余 6 字节为最多 6 张牌（不足补 255），每人按需要占若干条
+    ANTE     座位=座位号, 金额=下底注后剩余筹码
+    ROUND    参数=轮数, 金额=底池
+    SEE      座位=座位号
+    CALL     座位=座位号, 金额=下注额
+    RAISE    座位=座位号, 参数=倍数（已看牌为 2）, 金额=加注后的跟注金额
+    FOLD     座位=座位号, 参数=是否因筹码不足被迫弃牌
+    COMPARE_BET  座位=座位号, 金额=比牌下注额
+    COMPARE  座位=发起者, 参数=对手座位, 金额=结果（1 发起者赢, -1 输, 0 平局）
+    AWARD    座位=赢家, 参数=赢家人数, 金额=分得的筹码
+
+    writer = HistoryWriter("games.zjr")
+    simulate(100000, 3, [ai_policy] * 4, sink=writer)
+    writer.close()
+    with HistoryReader("games.zjr") as reader:
+        raises = sum(1 for _ in reader.records(RAISE))
+"""
+import mmap
+import struct
+from collections import namedtuple
+
+from events import Abort, RoundStart, Ante, See, Call, Raise, Fold, CompareBet, Compare, Showdown, PotAward
+
+HISTORY_MAGIC = b"ZJR1"
+HISTORY_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sI")
+_RECORD = struct.Struct("<BBHi")
+_CARDS = struct.Struct("<BB6s")
+RECORD_SIZE = _RECORD.size
+CARDS_PER_RECORD = 6
+NO_CARD = 255
+
+(GAME, CARDS, ANTE, ROUND, SEE, CALL, RAISE, FOLD, COMPARE_BET, COMPARE, AWARD) = range(11)
+KIND_NAMES = ["GAME", "CARDS", "ANTE", "ROUND", "SEE", "CALL", "RAISE", "FOLD", "COMPARE_BET", "COMPARE", "AWARD"]
+
+Record = namedtuple("Record", "kind seat arg amount")
+Game = namedtuple("Game", "num_seats num_cards ante hands actions awards")  # actions 为 Record 列表，awards 为 (座位, 筹码)
+
+class HistoryWriter:
+    """把引擎事件写成二进制牌谱的事件接收者（需要 verbosity=ACTIONS）
+
+    本局的记录先放在内存里，收到 PotAward 时连同局头和手牌一起写入缓冲区，
+    缓冲区超过 buffer_size 字节时才写文件。
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(_FILE_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION))
+        else:
+            with open(path, "rb") as f:
+                header = f.read(_FILE_HEADER.size)
+            if len(header) != _FILE_HEADER.size or _FILE_HEADER.unpack(header) != (HISTORY_MAGIC, HISTORY_VERSION):
+                self.file.close()
+                raise ValueError(f"不是牌谱文件或版本不同: {path}")
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.game = bytearray()   # 本局的行动记录
+        self.ante = 0
+        self.showdown = None
+
+    def emit(self, event):
+        kind = type(event)
+        pack = _RECORD.pack
+        if kind is Call:
+            self.game += pack(CALL, event.seat, 0, event.amount)
+        elif kind is Raise:
+            self.game += pack(RAISE, event.seat, event.amount // event.current_bet, event.current_bet)
+        elif kind is See:
+            self.game += pack(SEE, event.seat, 0, 0)
+        elif kind is Fold:
+            self.game += pack(FOLD, event.seat, event.forced, 0)
+        elif kind is RoundStart:
+            self.game += pack(ROUND, 0, event.round_num, event.pot)
+        elif kind is CompareBet:
+            self.game += pack(COMPARE_BET, event.seat, 0, event.amount)
+        elif kind is Compare:
+            self.game += pack(COMPARE, event.seat, event.opponent, event.result)
+        elif kind is Ante:
+            self.ante = event.amount
+            self.game += pack(ANTE, event.seat, 0, event.chips)
+        elif kind is Showdown:
+            self.showdown = event
+        elif kind is PotAward:
+            self._end_game(event)
+        elif kind is Abort:
+            self.game.clear()
+
+    def _end_game(self, award):
+        hands = [player[3] for player in self.showdown.players]
+        num_cards = len(hands[0])
+        buffer = self.buffer
+        buffer += _RECORD.pack(GAME, len(hands), num_cards, self.ante)
+        for seat, hand in enumerate(hands):
+            for i in range(0, num_cards, CARDS_PER_RECORD):
+                chunk = bytes(hand[i:i + CARDS_PER_RECORD])
+                buffer += _CARDS.pack(CARDS, seat, chunk.ljust(CARDS_PER_RECORD, bytes((NO_CARD,))))
+        buffer += self.game
+        for seat in award.seats:
+            buffer += _RECORD.pack(AWARD, seat, len(award.seats), award.amount)
+        self.game.clear()
+        self.showdown = None
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        """写入所有完整的牌局并关闭文件，未结束的牌局被丢弃"""
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class HistoryReader:
+    """用 mmap 读取二进制牌谱，只在访问时读入对应的页面"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"空的牌谱文件: {path}")
+        if len(self.map) < _FILE_HEADER.size or _FILE_HEADER.unpack_from(self.map) != (HISTORY_MAGIC, HISTORY_VERSION):
+            self.close()
+            raise ValueError(f"不是牌谱文件或版本不同: {path}")
+        self.num_records = (len(self.map) - _FILE_HEADER.size) // RECORD_SIZE
+
+    def __len__(self):
+        return self.num_records
+
+    def _view(self):
+        return memoryview(self.map)[_FILE_HEADER.size:_FILE_HEADER.size + self.num_records * RECORD_SIZE]
+
+    def records(self, kind=None, seat=None):
+        """按顺序逐条产生 Record，可按类型和座位筛选；CARDS 记录的参数和金额没有意义"""
+        view = self._view()
+        try:
+            for record in _RECORD.iter_unpack(view):
+                if (kind is None or record[0] == kind) and (seat is None or record[1] == seat):
+                    yield Record._make(record)
+        finally:
+            view.release()
+
+    def games(self):
+        """按顺序逐局产生 Game"""
+        view = self._view()
+        game = None
+        try:
+            for index, (kind, seat, arg, amount) in enumerate(_RECORD.iter_unpack(view)):
+                if kind == GAME:
+                    if game is not None:
+                        yield game
+                    game = Game(seat, arg, amount, [[] for _ in range(seat)], [], [])
+                elif kind == CARDS:
+                    offset = index * RECORD_SIZE + 2
+                    game.hands[seat].extend(card for card in view[offset:offset + CARDS_PER_RECORD]
+                                            if card != NO_CARD)
+                elif kind == AWARD:
+                    game.awards.append((seat, amount))
+                else:
+                    game.actions.append(Record(kind, seat, arg, amount))
+            if game is not None:
+                yield game
+        finally:
+            view.release()
+
+    def as_array(self):
+        """把全部记录看作 NumPy 结构化数组（字段 kind、seat、arg、amount），不复制数据；close 之后仍可使用"""
+        import numpy as np
+
+        dtype = np.dtype([("kind", "u1"), ("seat", "u1"), ("arg", "<u2"), ("amount", "<i4")])
+        return np.frombuffer(self.map, dtype=dtype, count=self.num_records, offset=_FILE_HEADER.size)
+
+    def close(self):
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # as_array 返回的数组或未读完的生成器仍在使用映射，等它们被回收后再释放
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
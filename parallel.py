@@ -0,0 +1,48 @@
+"""按块分配到进程池的工作
+
+equity、tournament 和 cfr 都把工作分成编号的块：每块使用由 (seed, 块编号) 确定的独立随机数流，
+按块编号顺序汇总，因此结果与进程数无关、可以复现。
+
+    with ChunkRunner(processes=8) as runner:
+        for result in runner.chunks(work, lambda i: (seed, i), num_chunks):
+            ...  # 达到精度后 break，本批剩余的块被丢弃
+"""
+import os
+from multiprocessing import Pool
+
+class ChunkRunner:
+    """processes > 1 时新建进程池并在关闭时结束；传入已有的 pool 时复用其进程，不负责关闭"""
+
+    __slots__ = ("pool", "own_pool", "wave_size")
+
+    def __init__(self, processes=1, pool=None):
+        self.own_pool = pool is None and processes > 1
+        self.pool = Pool(processes) if self.own_pool else pool
+        # 每批提交的块数：传入 pool 而 processes 为 1 时不知道进程数，按 CPU 数提交
+        self.wave_size = processes if processes > 1 or pool is None else os.cpu_count() or 1
+
+    def map(self, func, work):
+        """返回 [func(args) for args in work]，有进程池时并行计算"""
+        return self.pool.map(func, work) if self.pool else [func(args) for args in work]
+
+    def chunks(self, func, make_args, num_chunks):
+        """按块编号顺序逐个产生 func(make_args(i))，i 从 0 到 num_chunks - 1
+
+        每次提交一批 wave_size 块，调用者提前停止时本批剩余的块被丢弃、后面的块不再提交。
+        """
+        for start in range(0, num_chunks, self.wave_size):
+            stop = min(start + self.wave_size, num_chunks)
+            if self.pool:
+                yield from self.pool.map(func, [make_args(i) for i in range(start, stop)])
+            else:
+                yield from (func(make_args(i)) for i in range(start, stop))
+
+    def close(self):
+        if self.own_pool:
+            self.pool.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,273 @@
+import os
+import random
+import itertools
+import threading
+import weakref
+from array import array
+from collections import namedtuple
+
+# 定义扑克牌
+suits = ['♠', '♥', '♣', '♦']
+ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+rank_value = {rank: i for i, rank in enumerate(ranks)}
+# 牌用整数 0-51 表示：花色编号 * 13 + 点数编号，只在显示时转换成 "♠10" 形式的字符串
+card_names = [f"{suit}{rank}" for suit in suits for rank in ranks]
+deck = list(range(52))
+
+# 牌型查找表：按三张牌的编号 (a * 52 + b) * 52 + c 索引，缓存到文件避免每次启动重建
+HAND_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_table.bin")
+HAND_TABLE_MAGIC = b"ZJH1"
+category_names = ["单张", "对子", "顺子", "同花", "同花顺", "豹子"]
+
+def get_card_rank(card):
+    """获取牌的点数"""
+    return card % 13
+
+def get_card_suit(card):
+    """获取牌的花色"""
+    return suits[card // 13]
+
+def parse_card(name):
+    """把 "♠10" 形式的字符串转换成整数牌"""
+    return suits.index(name[0]) * 13 + rank_value[name[1:]]
+
+def format_hand(hand):
+    """把整数牌转换成字符串列表，用于显示"""
+    return [card_names[card] for card in hand]
+
+def decks_needed(num_players, num_cards):
+    """发 num_players * num_cards 张牌至少需要几副牌"""
+    return max(1, -(-num_players * num_cards // 52))
+
+class Dealer:
+    """每张牌桌自己的发牌器，持有独立的随机数生成器和牌堆，不与其他牌桌共享状态
+
+    num_decks 副牌混在一起发，同一张牌（相同的整数编号）最多出现 num_decks 次。
+    """
+
+    __slots__ = ("rng", "num_decks", "cards")
+
+    def __init__(self, rng=None, num_decks=1):
+        self.rng = rng if rng is not None else random.Random()
+        self.num_decks = num_decks
+        self.cards = deck * num_decks
+
+    def deal(self, num_players, num_cards):
+        """发牌，每人num_cards张
+
+        只对需要的 num_players * num_cards 张牌做部分 Fisher-Yates 抽取，不洗整副牌。
+        牌堆保留上次抽取后的顺序，从任意顺序开始抽取结果都是均匀随机的。
+        """
+        cards = self.cards
+        size = len(cards)
+        needed = num_players * num_cards
+        if needed > size:
+            raise ValueError("牌数不足")
+        random_float = self.rng.random
+        for i in range(needed):
+            j = i + int(random_float() * (size - i))
+            cards[i], cards[j] = cards[j], cards[i]
+        return [cards[i:i + num_cards] for i in range(0, needed, num_cards)]
+
+# 每个 rng 对应的 Dealer，deal_cards 每次调用时复用，不重新建牌堆；rng 被回收时一起释放
+_dealers = weakref.WeakKeyDictionary()
+
+def deal_cards(num_players, num_cards, rng=random, num_decks=1):
+    """发牌，每人num_cards张；rng 可传入各牌桌自己的 random.Random
+
+    同一个 rng 和副数复用同一个 Dealer；频繁发牌时也可以直接持有 Dealer 调用 deal。
+    """
+    try:
+        dealers = _dealers.setdefault(rng, {})
+    except TypeError:  # rng 不支持弱引用
+        return Dealer(rng, num_decks).deal(num_players, num_cards)
+    dealer = dealers.get(num_decks)
+    if dealer is None:
+        dealer = dealers[num_decks] = Dealer(rng, num_decks)
+    return dealer.deal(num_players, num_cards)
+
+def classify_hand(hand_ranks, hand_suits):
+    """按点数和花色判断3张牌的牌型，仅用于生成查找表"""
+    hand_ranks = sorted(hand_ranks, reverse=True)
+
+    is_flush = len(set(hand_suits)) == 1
+    is_straight = (max(hand_ranks) - min(hand_ranks) == 2 and len(set(hand_ranks)) == 3) or (hand_ranks == [12, 1, 0])
+    is_three_of_a_kind = len(set(hand_ranks)) == 1
+    is_pair = len(set(hand_ranks)) == 2
+
+    if is_three_of_a_kind:
+        return (5, hand_ranks)
+    elif is_flush and is_straight:
+        return (4, hand_ranks)
+    elif is_flush:
+        return (3, hand_ranks)
+    elif is_straight:
+        return (2, hand_ranks)
+    elif is_pair:
+        pair_rank = max([r for r in hand_ranks if hand_ranks.count(r) == 2])
+        single_rank = [r for r in hand_ranks if hand_ranks.count(r) == 1][0]
+        return (1, [pair_rank, single_rank])
+    else:
+        return (0, hand_ranks)
+
+def pack_strength(category, hand_ranks):
+    """把牌型和比较点数压缩成一个整数，整数越大牌越大"""
+    strength = category
+    for i in range(3):
+        strength = (strength << 4) | (hand_ranks[i] if i < len(hand_ranks) else 0)
+    return strength
+
+def unpack_strength(strength):
+    """由压缩整数还原 (牌型, 比较点数, 牌型名称)"""
+    category = strength >> 12
+    hand_ranks = [(strength >> 8) & 0xF, (strength >> 4) & 0xF, strength & 0xF]
+    if category == 1:
+        hand_ranks = hand_ranks[:2]
+    return (category, hand_ranks, category_names[category])
+
+def build_hand_table():
+    """枚举所有三张牌组合（按编号有序），生成牌力查找表"""
+    by_shape = {}
+    table = array("H", bytes(2 * 52 ** 3))
+    for a in range(52):
+        for b in range(52):
+            base = (a * 52 + b) * 52
+            for c in range(52):
+                cards = (a, b, c)
+                shape = (tuple(sorted(i % 13 for i in cards)), a // 13 == b // 13 == c // 13)
+                strength = by_shape.get(shape)
+                if strength is None:
+                    category, hand_ranks = classify_hand(shape[0], [i // 13 for i in cards])
+                    strength = by_shape[shape] = pack_strength(category, hand_ranks)
+                table[base + c] = strength
+    return table
+
+def load_hand_table(path=HAND_TABLE_FILE):
+    """读取缓存的查找表，不存在或损坏时重新生成并写回缓存"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] == HAND_TABLE_MAGIC and len(data) == 4 + 2 * 52 ** 3:
+            table = array("H")
+            table.frombytes(data[4:])
+            return table
+    except OSError:
+        pass
+    table = build_hand_table()
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HAND_TABLE_MAGIC)
+            f.write(table.tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # 缓存目录不可写时直接使用内存中的表
+    return table
+
+# 查找表在第一次使用时才读入（导入本模块没有文件读写），原地填充，其他模块导入的引用始终有效
+hand_strengths = array("H")
+hand_results = []
+_tables_lock = threading.Lock()
+
+def load_tables(path=HAND_TABLE_FILE):
+    """填充 hand_strengths 和 hand_results；已经填充时什么也不做"""
+    with _tables_lock:
+        if hand_strengths:
+            return
+        table = load_hand_table(path)
+        results_by_strength = {s: unpack_strength(s) for s in set(table)}
+        hand_results.extend([results_by_strength[s] for s in table])
+        hand_strengths.extend(table)
+
+def hand_strength(hand):
+    """3张牌的压缩牌力，可直接用整数比较大小"""
+    a, b, c = hand
+    try:
+        return hand_strengths[(a * 52 + b) * 52 + c]
+    except IndexError:
+        load_tables()
+        return hand_strengths[(a * 52 + b) * 52 + c]
+
+def evaluate_hand(hand):
+    """评估3张牌的牌型，返回 (牌型, 比较点数, 牌型名称)"""
+    a, b, c = hand
+    try:
+        category, tie_ranks, name = hand_results[(a * 52 + b) * 52 + c]
+    except IndexError:
+        load_tables()
+        category, tie_ranks, name = hand_results[(a * 52 + b) * 52 + c]
+    return category, list(tie_ranks), name  # 同一牌力的手牌共享 hand_results 中的条目，返回副本
+
+def compare_hands(hand1, hand2):
+    """比较两手牌大小（无花色比较）"""
+    strength1 = hand_strength(hand1)
+    strength2 = hand_strength(hand2)
+    return (strength1 > strength2) - (strength1 < strength2)
+
+# 所有顺子的点数（从大到小排列），按牌力从大到小排序，便于找到第一个即最大
+straight_ranks = sorted([(r + 2, r + 1, r) for r in range(11)] + [(12, 1, 0)],
+                        key=lambda s: pack_strength(2, s), reverse=True)
+BRUTE_FORCE_MAX_CARDS = 6  # 牌数不超过此值时直接枚举组合更快
+
+def best_three_strength(hand):
+    """根据点数和花色直方图直接求出手牌中最大3张牌的牌力"""
+    rank_counts = [0] * 13
+    suit_ranks = [[], [], [], []]
+    for card in hand:
+        rank = card % 13
+        rank_counts[rank] += 1
+        suit_ranks[card // 13].append(rank)
+
+    # 豹子
+    for rank in range(12, -1, -1):
+        if rank_counts[rank] >= 3:
+            return pack_strength(5, (rank, rank, rank))
+
+    # 同花顺 / 同花
+    flush_suits = [set(ranks_in_suit) for ranks_in_suit in suit_ranks if len(ranks_in_suit) >= 3]
+    if flush_suits:
+        for straight in straight_ranks:
+            for present in flush_suits:
+                if straight[0] in present and straight[1] in present and straight[2] in present:
+                    return pack_strength(4, straight)
+        return max(pack_strength(3, sorted(ranks_in_suit, reverse=True)[:3])
+                   for ranks_in_suit in suit_ranks if len(ranks_in_suit) >= 3)
+
+    # 顺子（此时任何花色都不足3张，不会组成同花）
+    for straight in straight_ranks:
+        if rank_counts[straight[0]] and rank_counts[straight[1]] and rank_counts[straight[2]]:
+            return pack_strength(2, straight)
+
+    # 对子
+    for rank in range(12, -1, -1):
+        if rank_counts[rank] >= 2:
+            kicker = max(r for r in range(13) if rank_counts[r] and r != rank)
+            return pack_strength(1, (rank, kicker))
+
+    # 单张
+    top = [r for r in range(12, -1, -1) if rank_counts[r]][:3]
+    return pack_strength(0, top)
+
+def select_best_three(hand):
+    """从手中选择炸金花规则下最大的3张牌（与逐一枚举组合的结果相同）"""
+    if len(hand) < 3:
+        return hand
+    if len(hand) <= BRUTE_FORCE_MAX_CARDS:
+        best_combination = None
+        best_strength = -1
+        for combo in itertools.combinations(hand, 3):
+            strength = hand_strength(combo)
+            if strength > best_strength:
+                best_strength = strength
+                best_combination = list(combo)
+        return best_combination
+
+    # 先求出最大牌力，再在相关点数的牌中按原顺序找第一组达到该牌力的组合
+    target = best_three_strength(hand)
+    needed_ranks = set(unpack_strength(target)[1])
+    candidates = [card for card in hand if card % 13 in needed_ranks]
+    for combo in itertools.combinations(candidates, 3):
+        if hand_strength(combo) == target:
+            return list(combo)
+
+HandInfo = namedtuple("HandInfo", "hand best score strength")  # 手牌、最佳3张、evaluate_hand 结果、压缩牌力
@@ -0,0 +1,67 @@
+"""基于模拟的搜索 AI
+
+每次模拟用 Table.fork 复制当前牌局，把对手的手牌换成从未见过的牌中随机抽出的牌
+（AI 不知道对手的牌），再对每个可选行动用 successor 得到后继状态、用 rollout 把这一局打完，
+取结束时筹码变化之和最大的行动。
+每次模拟只复制长度为座位数的几个数组，不深拷贝整个牌桌。
+
+    from search import RolloutPolicy
+    simulate(1000, 3, [RolloutPolicy(100)] + [ai_policy] * 3, seed=1)
+"""
+import random
+
+from rules import deck, decks_needed
+from engine import legal_options, successor, rollout, ai_policy
+
+class RolloutPolicy:
+    """每个候选行动模拟 num_rollouts 局的搜索策略；rollout_policy 为模拟时所有座位使用的策略"""
+
+    __slots__ = ("num_rollouts", "rollout_policy", "rng")
+
+    def __init__(self, num_rollouts=100, rollout_policy=ai_policy, seed=None):
+        self.num_rollouts = num_rollouts
+        self.rollout_policy = rollout_policy
+        self.rng = random.Random(seed)
+
+    def __call__(self, table, seat):
+        candidates = []
+        for action in legal_options(table, seat):
+            if action == "raise":
+                candidates.append((action, table.current_bet * 2 if table.seen[seat] else table.current_bet + 10))
+            elif action == "compare":
+                candidates.extend((action, opponent) for opponent in table.active_opponents(seat))
+            else:
+                candidates.append((action, None))
+
+        chips = table.chips[seat]
+        policies = [self.rollout_policy] * len(table.names)
+        totals = [0] * len(candidates)
+        for _ in range(self.num_rollouts):
+            # 同一组对手手牌用于所有候选行动，行动之间的比较更稳定
+            state = _determinize(table, seat, self.rng)
+            for i, (action, arg) in enumerate(candidates):
+                if action != "fold":  # 弃牌后筹码不再变化，价值为 0
+                    after = successor(state, seat, action, arg)
+                    rollout(after, policies)
+                    totals[i] += after.chips[seat] - chips
+        best = max(range(len(candidates)), key=totals.__getitem__)
+        return candidates[best]
+
+def _determinize(table, seat, rng):
+    """复制牌桌，并把对手的手牌换成从 seat 看不到的牌中随机抽出的牌"""
+    hands = table.hands
+    num_seats = len(hands)
+    num_cards = len(hands[seat])
+    unseen = deck * decks_needed(num_seats, num_cards)
+    for card in hands[seat]:
+        unseen.remove(card)
+    drawn = rng.sample(unseen, num_cards * (num_seats - 1))
+    state = table.fork(rng)
+    state.hands = [hands[seat] if i == seat else None for i in range(num_seats)]
+    state.infos = [table.infos[seat] if i == seat else None for i in range(num_seats)]
+    position = 0
+    for i in range(num_seats):
+        if i != seat:
+            state.hands[i] = drawn[position:position + num_cards]
+            position += num_cards
+    return state
@@ -0,0 +1,280 @@
+"""炸金花多桌服务器
+
+一个进程用 asyncio 同时运行多张牌桌：AI 座位在事件循环中直接决策，玩家座位通过本地
+TCP 连接异步应答，超时自动弃牌。协议为每行一个 JSON 对象：
+
+客户端 -> 服务器
+    {"op": "join", "name": "Bob"}                         加入（或开一张）等待中的牌桌
+    {"op": "action", "action": "see"|"call"|"fold"}
+    {"op": "action", "action": "raise", "amount": 30}
+    {"op": "action", "action": "compare", "target": 2}
+
+服务器 -> 客户端
+    {"type": "joined", "table": 1, "seat": 0, "players": [...]}
+    {"type": "event", "event": {...}}                     events.event_to_dict 的结果
+    {"type": "turn", "options": [...], "timeout": 30, ...} 轮到该玩家行动
+    {"type": "error", "message": "..."}                   行动无效，可以在剩余时间内重试
+    {"type": "table_over", "chips": {...}}
+
+    python server.py --port 8765 --seats 4 --humans 1
+    python server.py --client --name Bob
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from rules import format_hand
+from engine import BASE_BET, Table, start_game, next_seat, legal_options, apply_action, settle, ai_policy
+from events import See, event_to_dict, event_from_dict, render
+
+DEFAULT_PORT = 8765
+
+class HumanSeat:
+    """一个通过网络连接的玩家"""
+
+    def __init__(self, name, writer):
+        self.name = name
+        self.writer = writer
+        self.table = None
+        self.seat = None
+        self.pending = None  # 等待该玩家行动时的 Future
+        self.connected = True
+
+    def send(self, message):
+        if self.connected:
+            self.writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+
+class TableSink:
+    """把牌桌事件发送给桌上的玩家，别人看牌时不发送手牌"""
+
+    def __init__(self, humans):
+        self.humans = humans
+
+    def emit(self, event):
+        data = event_to_dict(event)
+        hidden = None
+        if type(event) is See:
+            hidden = dict(data, hand=None, best=None)
+        for human in self.humans:
+            human.send({"type": "event", "event": hidden if hidden and human.seat != event.seat else data})
+
+class HostedTable:
+    """一张牌桌：固定的座位数，前 humans 个座位留给玩家，其余为 AI"""
+
+    def __init__(self, table_id, seats, humans, num_cards, timeout, rng):
+        self.table_id = table_id
+        self.num_seats = seats
+        self.num_humans = humans
+        self.num_cards = num_cards
+        self.timeout = timeout
+        self.rng = rng
+        self.humans = []
+        self.ready = asyncio.Event()
+
+    def add_human(self, human):
+        human.table = self
+        human.seat = len(self.humans)
+        self.humans.append(human)
+        if len(self.humans) == self.num_humans:
+            self.ready.set()
+
+    async def run(self):
+        """等待玩家坐满后连续进行多局，直到筹码不足或所有玩家离开"""
+        await self.ready.wait()
+        names = [human.name for human in self.humans] + [f"AI{i}" for i in range(1, self.num_seats - self.num_humans + 1)]
+        table = Table(names)
+        action_order = list(range(self.num_seats))
+        for human in self.humans:
+            human.send({"type": "joined", "table": self.table_id, "seat": human.seat, "players": names})
+        sink = TableSink(self.humans)
+
+        while any(human.connected for human in self.humans):
+            if not start_game(table, action_order, self.num_cards, self.rng, sink=sink):
+                break
+            while True:
+                seat = next_seat(table)
+                if seat is None:
+                    break
+                if seat < self.num_humans:
+                    await self.human_turn(table, seat)
+                else:
+                    action, arg = ai_policy(table, seat)
+                    apply_action(table, seat, action, arg)
+            settle(table)
+            await asyncio.gather(*(human.writer.drain() for human in self.humans if human.connected),
+                                 return_exceptions=True)
+            if any(chips <= 0 for chips in table.chips):
+                break
+            if sum(chips >= BASE_BET for chips in table.chips) < 2:
+                break
+            action_order = action_order[1:] + action_order[:1]
+
+        for human in self.humans:
+            human.send({"type": "table_over", "chips": dict(zip(table.names, table.chips))})
+
+    async def human_turn(self, table, seat):
+        """等待玩家行动；超时、断线时自动弃牌，无效行动时在剩余时间内重新询问"""
+        human = self.humans[seat]
+        deadline = time.monotonic() + self.timeout
+        while human.connected:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            loop = asyncio.get_running_loop()
+            human.pending = loop.create_future()
+            human.send({
+                "type": "turn", "seat": seat, "options": legal_options(table, seat),
+                "round": table.round_num, "pot": table.pot, "current_bet": table.current_bet,
+                "chips": table.chips[seat], "seen": bool(table.seen[seat]),
+                "hand": table.hands[seat] if table.seen[seat] else None,
+                "best": table.hand_info(seat).best if table.seen[seat] else None,
+                "opponents": table.active_opponents(seat),
+                "timeout": remaining,
+            })
+            try:
+                await human.writer.drain()
+                message = await asyncio.wait_for(human.pending, remaining)
+            except (asyncio.TimeoutError, ConnectionError):
+                break
+            finally:
+                human.pending = None
+            if message is None:
+                break
+            action = message.get("action")
+            arg = message.get("target") if action == "compare" else message.get("amount")
+            if isinstance(arg, bool):
+                arg = None  # JSON 的 true/false 不是座位号或金额
+            if action == "raise":
+                min_raise = table.current_bet * 2 if table.seen[seat] else table.current_bet + 10
+                # 引擎把金额不足的加注当作不行动，这里当作无效操作重新询问
+                if not isinstance(arg, int) or arg < min_raise:
+                    human.send({"type": "error", "message": f"加注金额至少为 {min_raise}"})
+                    continue
+            try:
+                apply_action(table, seat, action, arg)
+                return
+            except ValueError as e:
+                human.send({"type": "error", "message": str(e)})
+        apply_action(table, seat, "fold")
+
+class GameServer:
+    """接受本地连接，把玩家分配到牌桌并运行所有牌桌"""
+
+    def __init__(self, seats=4, humans=1, num_cards=3, timeout=30.0, seed=None):
+        self.seats = seats
+        self.humans = humans
+        self.num_cards = num_cards
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.waiting = None  # 还没坐满的牌桌
+        self.tables = set()
+        self.next_table_id = 1
+
+    def seat_human(self, human):
+        if self.waiting is None:
+            table = HostedTable(self.next_table_id, self.seats, self.humans, self.num_cards, self.timeout,
+                          random.Random(self.rng.random()))
+            self.next_table_id += 1
+            task = asyncio.create_task(table.run())
+            self.tables.add(task)
+            task.add_done_callback(self.tables.discard)
+            self.waiting = table
+        table = self.waiting
+        table.add_human(human)
+        if table.ready.is_set():
+            self.waiting = None
+
+    async def handle_client(self, reader, writer):
+        human = None
+        try:
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    writer.write(b'{"type": "error", "message": "invalid json"}\n')
+                    continue
+                if not isinstance(message, dict):
+                    writer.write(b'{"type": "error", "message": "expected a json object"}\n')
+                    continue
+                op = message.get("op")
+                if op == "join" and human is None:
+                    human = HumanSeat(str(message.get("name") or "Player"), writer)
+                    self.seat_human(human)
+                elif op == "action" and human is not None and human.pending and not human.pending.done():
+                    human.pending.set_result(message)
+                else:
+                    writer.write(json.dumps({"type": "error", "message": f"unexpected op: {op}"}).encode() + b"\n")
+        except ConnectionError:
+            pass
+        finally:
+            if human is not None:
+                human.connected = False
+                if human.pending and not human.pending.done():
+                    human.pending.set_result(None)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+async def run_client(name, host="127.0.0.1", port=DEFAULT_PORT):
+    """简单的终端客户端：显示事件并读入行动"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps({"op": "join", "name": name}, ensure_ascii=False) + "\n").encode("utf-8"))
+    seat = None
+    async for line in reader:
+        message = json.loads(line)
+        kind = message["type"]
+        if kind == "joined":
+            seat = message["seat"]
+            print(f"加入第 {message['table']} 桌，座位 {seat}: {', '.join(message['players'])}")
+        elif kind == "event":
+            for text in render(event_from_dict(message["event"]), human_seats=(seat,)):
+                print(text)
+        elif kind == "turn":
+            if message["seen"]:
+                print(f"\n你的牌: {format_hand(message['hand'])}")
+                print(f"最佳3张牌（按炸金花规则）: {format_hand(message['best'])}")
+            print(f"筹码: {message['chips']}, 底池: {message['pot']}, 当前跟注金额: {message['current_bet']}")
+            choice = await asyncio.to_thread(input, f"选择行动 {message['options']}: ")
+            parts = choice.split()
+            action = {"op": "action", "action": parts[0] if parts else "fold"}
+            if len(parts) > 1 and parts[1].isdigit():
+                action["target" if action["action"] == "compare" else "amount"] = int(parts[1])
+            writer.write((json.dumps(action) + "\n").encode("utf-8"))
+        elif kind == "error":
+            print(f"错误: {message['message']}")
+        elif kind == "table_over":
+            print("\n游戏结束！最终筹码：")
+            for player_name, chips in message["chips"].items():
+                print(f"{player_name}: {chips} 筹码")
+            break
+    writer.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="炸金花多桌服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seats", type=int, default=4, help="每桌座位数")
+    parser.add_argument("--humans", type=int, default=1, help="每桌玩家座位数，其余为 AI")
+    parser.add_argument("--num-cards", type=int, default=3, help="每人发牌数量")
+    parser.add_argument("--timeout", type=float, default=30.0, help="每次行动的时限（秒），超时自动弃牌")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--client", action="store_true", help="作为客户端连接服务器")
+    parser.add_argument("--name", default="Player", help="客户端玩家名字")
+    args = parser.parse_args(argv)
+    if args.seats < 2:
+        parser.error("至少需要2个座位")
+    if not 1 <= args.humans <= args.seats:
+        parser.error("玩家座位数应为1到座位数")
+    if args.client:
+        asyncio.run(run_client(args.name, args.host, args.port))
+    else:
+        server = GameServer(args.seats, args.humans, args.num_cards, args.timeout, args.seed)
+        asyncio.run(server.serve(args.host, args.port))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""控制台输出与保存的牌局记录逐字节相同
+
+玩家座位由按种子随机选择的输入代替（包括无效输入），AI 按牌型决策（不依赖 win_prob.bin）。
+行为有意改变时在仓库根目录运行 PYTHONPATH=. python tests/test_console.py 重新生成 golden/console.txt。
+"""
+import builtins
+import contextlib
+import io
+import os
+import random
+from array import array
+
+import ai
+from engine import Table
+from main import play_single_game
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "console.txt")
+NUM_GAMES = 40
+
+def scripted_input(rng):
+    """返回代替 input 的函数：打印提示，并按种子在有效和无效的输入中随机选择"""
+    opponents = iter(())
+
+    def fake_input(prompt=""):
+        nonlocal opponents
+        print(prompt, end="")
+        if prompt.startswith("输入行动编号"):
+            valid = prompt[prompt.index("(") + 1:prompt.index(")")].split("/")
+            opponents = iter(["x", "1", "2", "3"])
+            return rng.choice(valid + ["9"])
+        if prompt.startswith("输入动作编号"):
+            return rng.choice(["1", "2", "3", "0"])
+        if prompt.startswith("输入加注金额"):
+            minimum = int(prompt.split("至少 ")[1].rstrip("): "))
+            return rng.choice([str(minimum - 1), str(minimum), str(minimum + 5), "abc"])
+        if prompt.startswith("输入对手编号"):
+            return next(opponents)
+        raise AssertionError(f"未预料的输入提示: {prompt}")
+    return fake_input
+
+def transcript(num_games=NUM_GAMES):
+    """按固定种子打 num_games 局，返回全部控制台输出"""
+    saved_input, saved_win_probs = builtins.input, ai.win_probs
+    ai.win_probs = None
+    out = io.StringIO()
+    try:
+        for game in range(num_games):
+            setup = random.Random(game)
+            num_cards = setup.randint(3, 13)
+            table = Table(["You", "AI1", "AI2", "AI3"])
+            table.chips[:] = array("l", [setup.choice([100, 40, 200, 15]) for _ in range(4)])
+            shift = game % 4
+            action_order = list(range(shift, 4)) + list(range(shift))
+            builtins.input = scripted_input(random.Random(game + 1))
+            with contextlib.redirect_stdout(out):
+                print(f"### game {game}: {num_cards} cards, chips {list(table.chips)}, order {action_order}")
+                played = play_single_game(num_cards, table, action_order, rng=random.Random(game))
+                print(f"### result: {played}, chips {list(table.chips)}")
+    finally:
+        builtins.input, ai.win_probs = saved_input, saved_win_probs
+    return out.getvalue()
+
+def test_console_transcript():
+    with open(GOLDEN_FILE, encoding="utf-8") as f:
+        expected = f.read()
+    assert transcript() == expected
+
+if __name__ == "__main__":
+    with open(GOLDEN_FILE, "w", encoding="utf-8") as f:
+        f.write(transcript())
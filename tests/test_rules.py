@@ -0,0 +1,82 @@
+"""查找表评估和最佳3张牌选择与原来的逐一计算结果相同"""
+import itertools
+import random
+
+from rules import (Dealer, evaluate_hand, classify_hand, hand_strength, compare_hands, select_best_three,
+                   get_card_rank, get_card_suit)
+
+CATEGORY_NAMES = {5: "豹子", 4: "同花顺", 3: "同花", 2: "顺子", 1: "对子", 0: "单张"}
+
+def reference_evaluate(hand):
+    """原来的 evaluate_hand：每次按点数和花色重新判断"""
+    category, hand_ranks = classify_hand([get_card_rank(card) for card in hand], [get_card_suit(card) for card in hand])
+    return category, hand_ranks, CATEGORY_NAMES[category]
+
+def reference_compare(hand1, hand2):
+    """原来的 compare_hands：先比牌型，再逐个比较点数"""
+    type1, ranks1, _ = reference_evaluate(hand1)
+    type2, ranks2, _ = reference_evaluate(hand2)
+    if type1 != type2:
+        return 1 if type1 > type2 else -1
+    for r1, r2 in zip(ranks1, ranks2):
+        if r1 != r2:
+            return 1 if r1 > r2 else -1
+    return 0
+
+def reference_best_three(hand):
+    """原来的 select_best_three：按顺序枚举所有组合，取第一组最大的"""
+    if len(hand) < 3:
+        return hand
+    best_combination = None
+    best_score = (-1, [])
+    for combo in itertools.combinations(hand, 3):
+        score = reference_evaluate(combo)
+        if score[:2] > best_score[:2]:
+            best_score = score
+            best_combination = list(combo)
+    return best_combination
+
+def test_evaluate_hand_all_triples():
+    # 包括多副牌时才会出现的重复牌
+    for hand in itertools.product(range(52), repeat=3):
+        assert evaluate_hand(hand) == reference_evaluate(hand), hand
+
+def test_evaluate_hand_returns_fresh_ranks():
+    first = evaluate_hand([0, 1, 2])
+    first[1].append(99)
+    assert evaluate_hand([13, 14, 15])[1] == [2, 1, 0]
+
+def test_compare_hands():
+    rng = random.Random(1)
+    for _ in range(50000):
+        hand1 = [rng.randrange(52) for _ in range(3)]
+        hand2 = [rng.randrange(52) for _ in range(3)]
+        assert compare_hands(hand1, hand2) == reference_compare(hand1, hand2), (hand1, hand2)
+
+def test_hand_strength_order():
+    hands = [list(hand) for hand in itertools.combinations(range(52), 3)]
+    random.Random(2).shuffle(hands)
+    for hand1, hand2 in zip(hands, hands[1:]):
+        strength1, strength2 = hand_strength(hand1), hand_strength(hand2)
+        assert (strength1 > strength2) - (strength1 < strength2) == reference_compare(hand1, hand2)
+
+def test_select_best_three():
+    rng = random.Random(3)
+    for num_decks in (1, 2, 3):
+        dealer = Dealer(rng, num_decks)
+        for num_cards in range(3, 14):
+            for _ in range(150):
+                hand = dealer.deal(1, num_cards)[0]
+                assert select_best_three(hand) == reference_best_three(hand), hand
+
+def test_select_best_three_duplicates():
+    # 从很少几种牌中有放回地抽取，多副牌时同一张牌出现多次的各种情况
+    rng = random.Random(4)
+    for num_cards in range(3, 14):
+        for _ in range(150):
+            pool = rng.sample(range(52), rng.randint(2, 6))
+            hand = [rng.choice(pool) for _ in range(num_cards)]
+            assert select_best_three(hand) == reference_best_three(hand), hand
+
+def test_select_best_three_short_hand():
+    assert select_best_three([5, 6]) == [5, 6]
@@ -0,0 +1,186 @@
+"""炸金花 AI 策略锦标赛
+
+让若干策略在同一张牌桌上对打：座位按策略轮流分配，每局像 play_game 一样轮转行动顺序，
+每局开始时重置筹码。对局按块分配到进程池，每块使用由 (seed, 块编号) 确定的独立随机数流，
+按块的顺序汇总，领先策略与其他每个策略的差值置信区间（按检查次数修正）都不包含 0 时提前停止，
+因此结果与进程数无关、可以复现。
+
+    python tournament.py ai category tight loose --seats 4 --num-cards 3 --processes 8
+    python tournament.py --list
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+from array import array
+from statistics import NormalDist
+
+from ai import Thresholds
+from winprob import load_win_probs
+from engine import START_CHIPS, Table, AIPolicy, ai_policy, play_hand
+from cfr import cfr_policy, load_policy
+from parallel import ChunkRunner
+
+CHUNK_SIZE = 500
+
+# 策略为 policy(table, seat) -> (行动, 参数)，放进进程池时必须可以 pickle
+STRATEGIES = {
+    "ai": ai_policy,
+    "category": AIPolicy(None),
+    "tight": AIPolicy(Thresholds(0.75, 0.85, 0.55, 0.9, 0.75)),
+    "loose": AIPolicy(Thresholds(0.45, 0.55, 0.25, 0.7, 0.5)),
+    "cfr": cfr_policy,  # 需要先用 cfr.py 训练出 policy.bin，否则与 ai 相同，默认不参赛
+}
+# 按胜率阈值决策的策略：没有 win_prob.bin 时都与 category 相同，默认不参赛
+WIN_PROB_STRATEGIES = ("ai", "tight", "loose")
+
+def _play_chunk(args):
+    """打一块对局，返回 (局数, 各策略每局平均输赢之和及平方和, 两两差值之和及平方和)"""
+    policies, lineup, num_cards, seed, chunk_index, size = args
+    rng = random.Random(f"{seed}:{chunk_index}")
+    num_strategies = len(policies)
+    num_seats = len(lineup)
+    seat_policies = [policies[i] for i in lineup]
+    seats_per_strategy = [lineup.count(i) for i in range(num_strategies)]
+    table = Table([f"P{i}" for i in range(num_seats)])
+    start_chips = array("l", [START_CHIPS] * num_seats)
+    sums = [0.0] * num_strategies
+    squares = [0.0] * num_strategies
+    diff_sums = [[0.0] * num_strategies for _ in range(num_strategies)]
+    diff_squares = [[0.0] * num_strategies for _ in range(num_strategies)]
+    for game in range(chunk_index * size, (chunk_index + 1) * size):
+        table.chips[:] = start_chips
+        shift = game % num_seats
+        action_order = list(range(shift, num_seats)) + list(range(shift))
+        if play_hand(table, action_order, num_cards, seat_policies, rng) is None:
+            raise ValueError("无法开局")
+        net = [0] * num_strategies
+        for seat, strategy in enumerate(lineup):
+            net[strategy] += table.chips[seat] - START_CHIPS
+        means = [net[i] / seats_per_strategy[i] for i in range(num_strategies)]
+        for i in range(num_strategies):
+            sums[i] += means[i]
+            squares[i] += means[i] * means[i]
+            for j in range(num_strategies):
+                diff = means[i] - means[j]
+                diff_sums[i][j] += diff
+                diff_squares[i][j] += diff * diff
+    return size, sums, squares, diff_sums, diff_squares
+
+def _half_width(total, square_total, count, z):
+    if count < 2:
+        return math.inf
+    mean = total / count
+    variance = max(0.0, (square_total - count * mean * mean) / (count - 1))
+    return z * math.sqrt(variance / count)
+
+def run_matchup(policies, num_seats=4, num_cards=3, seed=0, confidence=0.95, min_games=20 * CHUNK_SIZE,
+                max_games=1000000, processes=1, pool=None, chunk_size=CHUNK_SIZE):
+    """让 policies 中的策略对打，座位 i 使用 policies[i % len(policies)]
+
+    领先策略与其他每个策略每局输赢之差的置信区间都在 0 以上（且至少 min_games 局）时停止，
+    最多 max_games 局；停止判断的置信区间按检查次数做了 Bonferroni 修正，比 ci 宽。processes 和 pool 的用法见 parallel.ChunkRunner。
+    返回字典 {"games", "mean", "ci", "leader", "decided"}：mean、ci 为各策略每个座位每局的平均输赢筹码
+    及置信区间半宽，decided 表示 leader 是否已经显著领先。
+    """
+    num_strategies = len(policies)
+    if num_strategies < 2 or num_seats < num_strategies:
+        raise ValueError("至少需要2个策略，且座位数不少于策略数")
+    lineup = [seat % num_strategies for seat in range(num_seats)]
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    num_chunks = max(1, math.ceil(max_games / chunk_size))
+    # 每块之后都检查一次，且要同时比较 num_strategies - 1 对：把 1 - confidence 平均分给所有检查
+    # （Bonferroni），重复检查也不会把相同的策略判为分出胜负
+    num_looks = num_chunks - min(num_chunks, math.ceil(min_games / chunk_size)) + 1
+    stop_z = NormalDist().inv_cdf(1 - (1 - confidence) / (2 * num_looks * (num_strategies - 1)))
+    games = 0
+    sums = [0.0] * num_strategies
+    squares = [0.0] * num_strategies
+    diff_sums = [[0.0] * num_strategies for _ in range(num_strategies)]
+    diff_squares = [[0.0] * num_strategies for _ in range(num_strategies)]
+    leader = 0
+    decided = False
+    with ChunkRunner(processes, pool) as runner:
+        chunks = runner.chunks(_play_chunk, lambda i: (policies, lineup, num_cards, seed, i, chunk_size), num_chunks)
+        for chunk_games, chunk_sums, chunk_squares, chunk_diff_sums, chunk_diff_squares in chunks:
+            games += chunk_games
+            for i in range(num_strategies):
+                sums[i] += chunk_sums[i]
+                squares[i] += chunk_squares[i]
+                for j in range(num_strategies):
+                    diff_sums[i][j] += chunk_diff_sums[i][j]
+                    diff_squares[i][j] += chunk_diff_squares[i][j]
+            leader = max(range(num_strategies), key=lambda i: sums[i])
+            decided = all(diff_sums[leader][j] / games >
+                          _half_width(diff_sums[leader][j], diff_squares[leader][j], games, stop_z)
+                          for j in range(num_strategies) if j != leader)
+            if games >= min_games and decided:
+                break  # 分出胜负，丢弃本批剩余的块
+
+    return {"games": games,
+            "mean": [total / games for total in sums],
+            "ci": [_half_width(sums[i], squares[i], games, z) for i in range(num_strategies)],
+            "leader": leader,
+            "decided": decided}
+
+def round_robin(names, num_seats=4, num_cards=3, processes=1, **kwargs):
+    """两两对打 STRATEGIES 中的策略 names，返回 [(策略1, 策略2, run_matchup 的结果), ...]"""
+    with ChunkRunner(processes) as runner:
+        return [(first, second, run_matchup([STRATEGIES[first], STRATEGIES[second]], num_seats, num_cards,
+                                            processes=processes, pool=runner.pool, **kwargs))
+                for first, second in itertools.combinations(names, 2)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="炸金花 AI 策略锦标赛")
+    parser.add_argument("names", nargs="*",
+                        help=f"参赛策略，默认为全部（不含缺少数据文件的策略）：{', '.join(STRATEGIES)}")
+    parser.add_argument("--list", action="store_true", help="列出可用的策略")
+    parser.add_argument("--seats", type=int, default=4, help="每桌座位数，两个策略轮流就座")
+    parser.add_argument("--num-cards", type=int, default=3, help="每人发牌数量")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--min-games", type=int, default=20 * CHUNK_SIZE)
+    parser.add_argument("--max-games", type=int, default=1000000, help="每组对局的最多局数")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="进程数")
+    parser.add_argument("--output", help="把 JSON 结果写入文件")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, policy in STRATEGIES.items():
+            print(f"{name}: {getattr(policy, '__name__', None) or repr(policy)}")
+        return
+    # 缺少数据文件时有些策略与别的策略完全相同，相同的策略对打永远分不出胜负：默认不参赛，指定时给出警告
+    missing = {}
+    if load_win_probs() is None:
+        missing.update(dict.fromkeys(WIN_PROB_STRATEGIES, "没有找到 win_prob.bin，与 category 相同；请先运行 winprob.py"))
+    policy = load_policy()
+    if policy is None:
+        missing["cfr"] = "没有找到 policy.bin，与 ai 相同；请先运行 cfr.py 训练"
+    elif policy.num_players != args.seats:
+        missing["cfr"] = f"policy.bin 是按 {policy.num_players} 个座位训练的，与 ai 相同；请用 cfr.py --players {args.seats} 训练"
+    names = args.names or [name for name in STRATEGIES if name not in missing]
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"未知的策略: {', '.join(unknown)}")
+    if len(names) < 2:
+        parser.error("至少需要2个策略" if args.names else f"默认可用的策略不足2个: {next(iter(missing.values()))}")
+    for name in names:
+        if name in missing:
+            print(f"警告: {name}: {missing[name]}", file=sys.stderr)
+
+    results = round_robin(names, args.seats, args.num_cards, args.processes, seed=args.seed,
+                          confidence=args.confidence, min_games=args.min_games, max_games=args.max_games)
+    for first, second, result in results:
+        summary = ", ".join(f"{name} {mean:+.2f} ± {ci:.2f}"
+                            for name, mean, ci in zip((first, second), result["mean"], result["ci"]))
+        verdict = f"{(first, second)[result['leader']]} 胜出" if result["decided"] else "未分胜负"
+        print(f"{first} vs {second}: {result['games']} 局, {summary}（每座位每局筹码）, {verdict}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([{"strategies": [first, second], **result} for first, second, result in results], f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""炸金花胜率表
+
+离线生成每种最佳3张牌力在 num_cards 张手牌、d 副牌、k 个对手时的获胜概率，写入紧凑的二进制文件；
+AI 启动时用 mmap 映射该文件，对局中每次查询只是一次下标计算，多个进程共享同一份页面缓存。
+
+获胜概率按对手手牌相互独立近似：先用 batch 抽样得到一手牌最佳3张牌力的分布，
+牌力为 s 时战胜一个对手的概率 q = P(对手 < s) + P(对手 = s) / 2（平局算半局），
+战胜 k 个对手的概率为 q ** k。生成需要 NumPy，读取只用标准库：
+
+    python winprob.py                     # 每种发牌数默认抽样 200000 手
+    python winprob.py --samples 1000000   # 更精确，但更慢
+"""
+import functools
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from rules import hand_strengths, decks_needed, load_tables
+
+WIN_PROB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "win_prob.bin")
+WIN_PROB_MAGIC = b"ZJW2"
+# 文件头：魔数、牌力种数、最少/最多发牌数、最多副数、最多对手数；之后是按大小排列的牌力 (uint16，补齐到4字节)
+# 和 float32 概率，下标为 (((发牌数 - 最少发牌数) * 最多副数 + 副数 - 1) * 最多对手数 + 对手数 - 1) * 牌力种数
+# + 牌力序号
+_HEADER = struct.Struct("<4sHBBBB2x")
+MIN_CARDS = 3
+MAX_CARDS = 13
+MAX_OPPONENTS = 11
+MAX_DECKS = decks_needed(MAX_OPPONENTS + 1, MAX_CARDS)
+
+@functools.lru_cache(maxsize=None)
+def all_strengths():
+    """所有可能的压缩牌力，从小到大"""
+    load_tables()
+    return tuple(sorted(set(hand_strengths)))
+
+def _strengths_offset(num_strengths):
+    return _HEADER.size + (2 * num_strengths + 3) // 4 * 4
+
+def strength_distribution(num_cards, num_decks=1, samples=200000, seed=0):
+    """抽样 samples 手 num_cards 张牌，返回每种牌力（按 all_strengths() 的顺序）出现的比例"""
+    import numpy as np
+    from batch import batch_strength, deal_batch
+
+    hands = deal_batch(samples, 1, num_cards, seed=seed, num_decks=num_decks).reshape(samples, num_cards)
+    strengths = batch_strength(hands)
+    index = np.searchsorted(np.array(all_strengths(), dtype=np.uint16), strengths)
+    return np.bincount(index, minlength=len(all_strengths())) / samples
+
+def build_win_probs(max_cards=MAX_CARDS, max_opponents=MAX_OPPONENTS, samples=200000, seed=0, max_decks=MAX_DECKS):
+    """生成胜率表，返回 float32 的 array，排列方式见文件头说明"""
+    import numpy as np
+
+    num_strengths = len(all_strengths())
+    probs = np.zeros((max_cards - MIN_CARDS + 1, max_decks, max_opponents, num_strengths), dtype=np.float32)
+    exponents = np.arange(1, max_opponents + 1)[:, None]
+    for num_cards in range(MIN_CARDS, max_cards + 1):
+        for num_decks in range(1, max_decks + 1):
+            frequency = strength_distribution(num_cards, num_decks, samples, seed)
+            below = np.concatenate(([0.0], np.cumsum(frequency)[:-1]))
+            probs[num_cards - MIN_CARDS, num_decks - 1] = (below + frequency / 2) ** exponents
+    return array("f", probs.tobytes())
+
+def write_win_probs(probs, path=WIN_PROB_FILE, max_cards=MAX_CARDS, max_opponents=MAX_OPPONENTS, max_decks=MAX_DECKS):
+    """把胜率表写入文件（先写临时文件再替换，正在映射旧文件的进程不受影响）"""
+    num_strengths = len(all_strengths())
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(WIN_PROB_MAGIC, num_strengths, MIN_CARDS, max_cards, max_decks, max_opponents))
+        f.write(array("H", all_strengths()).tobytes())
+        f.write(bytes(_strengths_offset(num_strengths) - _HEADER.size - 2 * num_strengths))
+        f.write(probs.tobytes())
+    os.replace(tmp_path, path)
+
+class WinProbTable:
+    """mmap 映射的胜率表，只读"""
+
+    __slots__ = ("file", "map", "probs", "index", "min_cards", "max_cards", "max_decks", "max_opponents",
+                 "num_strengths")
+
+    def __init__(self, path=WIN_PROB_FILE):
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, num_strengths, min_cards, max_cards, max_decks, max_opponents = _HEADER.unpack_from(self.map)
+            offset = _strengths_offset(num_strengths)
+            size = (max_cards - min_cards + 1) * max_decks * max_opponents * num_strengths
+            if magic != WIN_PROB_MAGIC or len(self.map) != offset + 4 * size:
+                raise ValueError(f"无效的胜率表文件: {path}")
+            strengths = memoryview(self.map)[_HEADER.size:_HEADER.size + 2 * num_strengths].cast("H")
+            self.index = {strength: i for i, strength in enumerate(strengths)}
+            strengths.release()
+            self.probs = memoryview(self.map)[offset:].cast("f")
+        except Exception:
+            self.close()
+            raise
+        self.min_cards = min_cards
+        self.max_cards = max_cards
+        self.max_decks = max_decks
+        self.max_opponents = max_opponents
+        self.num_strengths = num_strengths
+
+    def lookup(self, strength, num_cards, num_opponents, num_decks=None):
+        """牌力为 strength 的 num_cards 张手牌战胜 num_opponents 个对手的概率；超出表的范围时返回 None
+
+        num_decks 为牌桌实际使用的副数，为 None 时按 num_opponents + 1 人所需的副数。
+        """
+        if num_decks is None:
+            num_decks = decks_needed(num_opponents + 1, num_cards)
+        if not (self.min_cards <= num_cards <= self.max_cards and 1 <= num_decks <= self.max_decks
+                and 1 <= num_opponents <= self.max_opponents):
+            return None
+        row = ((num_cards - self.min_cards) * self.max_decks + num_decks - 1) * self.max_opponents + num_opponents - 1
+        return self.probs[row * self.num_strengths + self.index[strength]]
+
+    def close(self):
+        if getattr(self, "probs", None) is not None:
+            self.probs.release()
+            self.probs = None
+        if getattr(self, "map", None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+def load_win_probs(path=WIN_PROB_FILE):
+    """映射胜率表文件；文件不存在或无效时返回 None，AI 退回按牌型决策"""
+    try:
+        return WinProbTable(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def main(argv=None):
+    import argparse  # 只有生成时需要，AI 导入本模块时不用为它付出启动时间
+
+    parser = argparse.ArgumentParser(description="生成炸金花胜率表")
+    parser.add_argument("--samples", type=int, default=200000, help="每种发牌数抽样的手数")
+    parser.add_argument("--max-cards", type=int, default=MAX_CARDS, help="最多发牌数")
+    parser.add_argument("--max-opponents", type=int, default=MAX_OPPONENTS, help="最多对手数")
+    parser.add_argument("--max-decks", type=int, default=MAX_DECKS, help="最多副数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=WIN_PROB_FILE)
+    args = parser.parse_args(argv)
+    if not MIN_CARDS <= args.max_cards <= 255 or not 1 <= args.max_opponents <= 255 or not 1 <= args.max_decks <= 255:
+        parser.error("发牌数、对手数或副数超出范围")
+    probs = build_win_probs(args.max_cards, args.max_opponents, args.samples, args.seed, args.max_decks)
+    write_win_probs(probs, args.output, args.max_cards, args.max_opponents, args.max_decks)
+    print(f"已写入 {args.output}（{os.path.getsize(args.output)} 字节）", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()